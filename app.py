@@ -12,6 +12,7 @@ from views.login import toon_loginscherm
 
 # Stel logging in op INFO-niveau zodat belangrijke informatie gelogd wordt (voor ontwikkelaars)
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 
 # 1. Bepaal de huidige directory (waar deze app.py zich bevindt)
@@ -21,8 +22,7 @@ current_dir = os.path.dirname(__file__)
 load_css(current_dir)
 
 # Log dat de applicatie gestart is
-server_time = time.strftime("%H:%M:%S", time.localtime())
-print(f"Running app.py at {server_time}")
+logger.debug("Running app.py at %s", time.strftime("%H:%M:%S", time.localtime()))
 
 # 3. Controleer of de 'logged_in' status al in de sessie staat.
 #    Als dat niet zo is, stel de standaardwaarde in op True (pas dit aan indien nodig).
@@ -1,18 +1,17 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
-import pandas as pd
 import streamlit as st
 
 # Importeer de benodigde helpers en API-client
 from utils.api_client import APIClient
 from utils.excel_utils import ExcelHandler
-from utils.metadata_handler import build_metadata_map
+from utils.metadata_handler import build_metadata_map, fetch_metadata, get_columns_mapping
 
 
-# Stel logging in op DEBUG-niveau voor gedetailleerde informatie
-logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
 
 class DatasetDownloader:
     """
@@ -30,16 +29,31 @@ class DatasetDownloader:
     def generate_excel(self) -> bytes:
         """
         Genereer een Excel-bestand met data uit de API.
-        
+
+        Het resultaat wordt 10 minuten gecachet per omgeving, configuratie en complexselectie,
+        zodat nogmaals op "Genereer Excel" klikken de API niet opnieuw bevraagt.
+
+        Returns:
+            bytes: Excel bestand als bytes object
+        """
+        complex_selectie = tuple(self.complex_selectie) if self.complex_selectie else ()
+        return _build_excel(self.config, self.api_client, complex_selectie)
+
+    def _generate_excel(self) -> bytes:
+        """
+        Haal de data op uit de API en schrijf deze naar een Excel-bestand (zonder cache).
+
         Returns:
             bytes: Excel bestand als bytes object
         """
         object_type = self.config["objectType"]
-        attribute_names = [attr["AttributeName"] for attr in self.config.get("attributes", [])]
+        attribute_names = self.config.get("__attribute_names__") or [
+            attr["AttributeName"] for attr in self.config.get("attributes", [])
+        ]
 
         # Haal metadata op via de API
         try:
-            metadata = self.api_client.get_metadata(object_type)
+            metadata = fetch_metadata(self.api_client, object_type)
             st.success("Metadata opgehaald van de API")
         except Exception as e:
             st.error(f"Fout bij ophalen metadata: {str(e)}")
@@ -50,30 +64,33 @@ class DatasetDownloader:
 
         # Check if complex_selectie exists and handle data fetching accordingly
         if self.complex_selectie:
-            # Loop through each complex and make separate API calls
-            for complex_id in self.complex_selectie:
-                print("="*50)
-                print(f"Processing complex_id: {complex_id}")
-                filter_params = {"Cluster": complex_id}
-                print(f"Filter params being sent: {filter_params}")
-                try:
-                    print("Before API call")
-                    response_data = self.api_client.get_all_objects(
+            # Haal de complexen gelijktijdig op; de API-calls zijn onafhankelijk van elkaar.
+            # Streamlit-elementen zijn niet thread-safe, dus de workers krijgen geen st mee
+            # en de meldingen worden pas getoond nadat alle calls klaar zijn.
+            max_workers = min(8, len(self.complex_selectie))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    complex_id: executor.submit(
+                        self.api_client.get_all_objects,
                         object_type=object_type,
                         attributes=attribute_names,
                         only_active=True,
-                        filter_params=filter_params,
-                        st=st,
+                        filter_params={"Cluster": complex_id},
                     )
-                    print("After API call")
-                    print(f"Response data keys: {response_data.keys()}")
-                    print(f"Number of objects in response: {len(response_data.get('objects', []))}")
+                    for complex_id in self.complex_selectie
+                }
+
+                # Verwerk de resultaten in de volgorde van de selectie
+                for complex_id, future in futures.items():
+                    try:
+                        response_data = future.result()
+                    except Exception as e:
+                        logger.error("ERROR for complex %s: %s", complex_id, str(e))
+                        st.error(f"Fout bij ophalen data voor complex {complex_id}: {str(e)}")
+                        raise
+                    logger.debug("Number of objects for complex %s: %s", complex_id, len(response_data.get('objects', [])))
                     all_dataset_data.extend(response_data.get("objects", []))
                     st.success(f"Data opgehaald voor complex: {complex_id}")
-                except Exception as e:
-                    print(f"ERROR for complex {complex_id}: {str(e)}")
-                    st.error(f"Fout bij ophalen data voor complex {complex_id}: {str(e)}")
-                    raise
         else:
             # Fetch all data without complex filtering
             try:
@@ -83,6 +100,7 @@ class DatasetDownloader:
                     only_active=True,
                     filter_params={},
                     st=st,
+                    concurrency=4,
                 )
                 all_dataset_data.extend(response_data.get("objects", []))
                 st.success("Data succesvol opgehaald")
@@ -90,15 +108,12 @@ class DatasetDownloader:
                 st.error(f"Fout bij ophalen data: {str(e)}")
                 raise
 
-        logging.debug(f"Totaal aantal objecten: {len(all_dataset_data)}")
+        logger.debug("Totaal aantal objecten: %s", len(all_dataset_data))
         if all_dataset_data:
-            logging.debug(f"Eerste object (voorbeeld): {all_dataset_data[0]}")
+            logger.debug("Eerste object (voorbeeld): %s", all_dataset_data[0])
 
         # Bouw een mapping van Excel-kolomnamen naar API-veld namen
-        columns_mapping = {
-            attr["excelColumnName"]: attr["AttributeName"]
-            for attr in self.config.get("attributes", [])
-        }
+        columns_mapping = get_columns_mapping(self.config)
         metadata_map = build_metadata_map(metadata, self.config)
 
         # Genereer het Excel-bestand
@@ -109,9 +124,31 @@ class DatasetDownloader:
         )
         excel_file = handler.create_excel_file(data=all_dataset_data)
 
-        # Toon een preview van de eerste 5 rijen van het Excel-bestand
+        # Toon een preview van de eerste 5 rijen van het Excel-bestand.
+        # Het DataFrame staat nog in de handler, dus de Excel hoeft niet opnieuw ingelezen te worden.
         st.write("Preview van de eerste 5 rijen van de Excel file:")
-        preview_df = pd.read_excel(excel_file)
-        st.dataframe(preview_df.head(5), hide_index=True)
+        st.dataframe(handler.dataframe.head(5), hide_index=True)
+
+        return excel_file.getvalue()
 
-        return excel_file
\ No newline at end of file
+
+# Elke cache-entry bevat een volledige werkmap; max_entries begrenst het geheugen bij veel verschillende selecties
+@st.cache_data(ttl=600, max_entries=16, show_spinner="Excel wordt gegenereerd...",
+               hash_funcs={APIClient: lambda client: client.base_url})
+def _build_excel(config: Dict[str, Any], api_client: APIClient, complex_selectie: Tuple[str, ...]) -> bytes:
+    """
+    Gecachete variant van DatasetDownloader._generate_excel.
+
+    De meldingen en de preview die tijdens het genereren getoond worden, speelt Streamlit
+    bij een cache-hit opnieuw af.
+    """
+    downloader = DatasetDownloader(config, api_client, list(complex_selectie))
+    return downloader._generate_excel()
+
+
+def clear_download_cache() -> None:
+    """
+    Gooi de gecachete downloads weg, bijvoorbeeld na een upload. Anders levert een download
+    tot tien minuten lang nog de data van vóór de upload.
+    """
+    _build_excel.clear()
@@ -1,16 +1,28 @@
 import logging
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Optional
+import numpy as np
 import pandas as pd
 import streamlit as st
 import uuid
 
 # Importeer de benodigde helpers en API-client
-from utils.metadata_handler import build_metadata_map, DataTypeMapper
+from utils.metadata_handler import build_metadata_map, fetch_metadata, get_columns_mapping, DataTypeMapper, DATE_FORMATS
 from utils.dataset_config import DatasetConfig
 from utils.validation import ExcelValidator
+from handlers.dataset_downloader import clear_download_cache
 
-# Stel logging in op DEBUG-niveau voor gedetailleerde informatie
-logging.basicConfig(level=logging.DEBUG)
+try:
+    # python-calamine (Rust) leest xlsx-bestanden veel sneller en zuiniger dan openpyxl
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:  # python-calamine is optioneel
+    EXCEL_ENGINE = "openpyxl"
+
+logger = logging.getLogger(__name__)
+
+# Formaten voor datumcellen die niet aan het formaat uit de metadata voldoen: echte Excel-datumcellen
+# ('2023-01-31 00:00:00') en dd-mm-jjjj, het formaat waarin de download datums wegschrijft
+FALLBACK_DATE_FORMATS = ("ISO8601", DATE_FORMATS["dd-MM-yyyy"])
 
 
 # ------------------------------
@@ -42,34 +54,36 @@ class ExcelUploadStep2:
         self.config = config
         self.dataset_config = dataset_config
 
-    def get_metadata_and_mappings(self) -> Tuple[Dict[str, Any], Dict[str, str], Dict[str, Any], Dict[str, Any]]:
+    def get_metadata_and_mappings(self) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, str], Dict[str, Any], Dict[str, Any]]:
         try:
-            metadata = self.dataset_config.api_client.get_metadata(self.config["objectType"])
+            metadata = fetch_metadata(self.dataset_config.api_client, self.config["objectType"])
         except Exception as e:
             st.error(f"Error getting metadata: {e}")
-            return {}, {}, {}, {}
+            return {}, {}, {}, {}, {}
+
+        # Bouw de metadata per attribuut één keer op; stap 4 en 5 gebruiken deze mapping
+        metadata_map = build_metadata_map(metadata, self.config)
 
         # Bouw een mapping van Excel-kolomnamen naar API-veld namen
-        columns_mapping = {
-            attr["excelColumnName"]: attr["AttributeName"]
-            for attr in self.config.get("attributes", [])
-        }
+        columns_mapping = get_columns_mapping(self.config)
         dtype_mapping = {}
         date_format_mapping = {}
         attributes = metadata["objectTypes"][0]["attributes"]
+        attr_by_name = {attr["name"]: attr for attr in attributes}
         for excel_col, api_field in columns_mapping.items():
-            field_metadata = next((attr for attr in attributes if attr["name"] == api_field), None)
+            field_metadata = attr_by_name.get(api_field)
             if field_metadata:
                 field_type = field_metadata.get("type", "").upper()
                 if field_type == "STRING":
-                    dtype_mapping[excel_col] = str
+                    # Arrow-strings gebruiken veel minder geheugen dan een Python str-object per cel
+                    dtype_mapping[excel_col] = "string[pyarrow]"
                 elif field_type == "INT":
                     dtype_mapping[excel_col] = "Int64"
                 elif field_type == "DATE":
                     # Lees datumkolommen als string; conversie volgt later
                     dtype_mapping[excel_col] = str
                     date_format_mapping[excel_col] = field_metadata.get("dateFormat")
-        return metadata, columns_mapping, dtype_mapping, date_format_mapping
+        return metadata, metadata_map, columns_mapping, dtype_mapping, date_format_mapping
 
 
 # ------------------------------------------------------------
@@ -86,6 +100,9 @@ class ExcelUploadStep3:
         self.object_type = object_type
 
     def read_and_convert_excel(self, excel_file) -> pd.DataFrame:
+        # UploadedFile is al een BytesIO; zet de positie terug zodat een eerder gelezen
+        # bestand zonder extra kopie opnieuw geparsed kan worden.
+        excel_file.seek(0)
         df = self._read_excel(excel_file, self.dtype_mapping)
         self._convert_date_columns(df, self.date_format_mapping)
         self._generate_identifiers(df)
@@ -93,7 +110,7 @@ class ExcelUploadStep3:
 
     def _read_excel(self, file, dtype_mapping: Dict[str, Any]) -> pd.DataFrame:
         """Lees het Excel-bestand in met de opgegeven datatypes."""
-        return pd.read_excel(file, dtype=dtype_mapping)
+        return pd.read_excel(file, dtype=dtype_mapping, engine=EXCEL_ENGINE)
 
     def _convert_date_columns(self, df: pd.DataFrame, date_format_mapping: Dict[str, Any]) -> None:
         """Converteer datumkolommen naar het juiste formaat."""
@@ -101,22 +118,45 @@ class ExcelUploadStep3:
             if col in df.columns:
                 try:
                     if date_format == "yyyy":
-                        df[col] = df[col].astype(str).str.replace(r'\.0$', '', regex=True)
-                        df[col] = df[col].str.replace(',', '')
-                    elif date_format in ["dd-MM-yyyy", "yyyy-MM-dd"]:
-                        df[col] = pd.to_datetime(df[col], format=date_format, errors='coerce')
+                        # Jaartallen kunnen als '2015.0' of '2,015' binnenkomen; cast hele getallen in één keer
+                        # naar Int64 en laat overige waarden ongemoeid, zodat de validatie ze kan melden.
+                        tekst = df[col].astype("string").str.replace(",", "", regex=False)
+                        jaren = pd.to_numeric(tekst, errors="coerce")
+                        hele_jaren = jaren.notna() & (jaren % 1 == 0)
+                        df[col] = tekst.mask(hele_jaren, jaren.where(hele_jaren).astype("Int64").astype("string"))
+                    elif date_format in DATE_FORMATS:
+                        df[col] = self._parse_dates(df[col], DATE_FORMATS[date_format])
                 except Exception as e:
                     st.warning(f"Could not convert column {col} to date format {date_format}: {str(e)}")
 
+    @staticmethod
+    def _parse_dates(series: pd.Series, strftime_format: str) -> pd.Series:
+        """
+        Parse een datumkolom met het strftime-formaat uit de metadata (snelle C-parser).
+        Waarden die daar niet aan voldoen, worden alleen nog met de vaste formaten uit
+        FALLBACK_DATE_FORMATS geprobeerd. Er wordt niet gegokt: wat ook daarmee niet lukt,
+        blijft NaT.
+        """
+        dates = pd.to_datetime(series, format=strftime_format, errors="coerce", cache=True)
+        for fallback_format in FALLBACK_DATE_FORMATS:
+            afwijkend = dates.isna() & series.notna()
+            if not afwijkend.any():
+                break
+            dates[afwijkend] = pd.to_datetime(series[afwijkend], format=fallback_format, errors="coerce")
+        return dates
+
     def _generate_identifiers(self, df: pd.DataFrame) -> None:
         """Generate identifiers for rows where it is missing."""
         if 'identifier' not in df.columns:
             df['identifier'] = None
 
-        for index, row in df.iterrows():
-            if pd.isna(row['identifier']) or row['identifier'] == '':
-                short_uuid = str(uuid.uuid4())[:8]
-                df.loc[index, 'identifier'] = f"{self.object_type}_{short_uuid}"
+        # Bepaal in één keer welke rijen nog geen identifier hebben en vul die met één toewijzing
+        ontbreekt = df['identifier'].isna() | (df['identifier'] == '')
+        if ontbreekt.any():
+            df['identifier'] = df['identifier'].astype(object)
+            df.loc[ontbreekt, 'identifier'] = [
+                f"{self.object_type}_{str(uuid.uuid4())[:8]}" for _ in range(int(ontbreekt.sum()))
+            ]
 
     def show_preview(self, df: pd.DataFrame) -> None:
         """Toon een preview van de eerste 5 rijen van de ingelezen Excel-data."""
@@ -135,18 +175,18 @@ class ExcelUploadStep4:
 
     def __init__(self, config: Dict[str, Any], dataset_config: DatasetConfig,
                  selected_dataset: str, columns_mapping: Dict[str, str],
-                 metadata: Dict[str, Any]):
+                 metadata: Dict[str, Any], metadata_map: Dict[str, Any]):
         self.config = config
         self.dataset_config = dataset_config
         self.selected_dataset = selected_dataset
         self.columns_mapping = columns_mapping
         self.metadata = metadata
+        self.metadata_map = metadata_map
 
     def validate_excel(self, df: pd.DataFrame) -> bool:
         object_type_val = self.dataset_config.get_object_type(self.selected_dataset)
-        metadata_map = build_metadata_map(self.metadata, self.config)
         validator = ExcelValidator(
-            metadata=metadata_map,
+            metadata=self.metadata_map,
             columns_mapping=self.columns_mapping,
             object_type=object_type_val
         )
@@ -163,8 +203,9 @@ class ExcelUploadStep4:
         """Toon een overzicht van de verwachte kolomtypes en formaten."""
         st.subheader("Expected Column Types")
         meta_data = []
+        attr_by_name = {attr["name"]: attr for attr in attributes}
         for api_name, excel_name in validator.reverse_mapping.items():
-            field_metadata = next((attr for attr in attributes if attr["name"] == api_name), {})
+            field_metadata = attr_by_name.get(api_name, {})
             meta_data.append({
                 "Excel Column": excel_name,
                 "Expected Type": field_metadata.get("type", "UNKNOWN").upper(),
@@ -186,75 +227,110 @@ class ExcelUploadStep5:
 
     def __init__(self, config: Dict[str, Any], dataset_config: DatasetConfig,
                  selected_dataset: str, columns_mapping: Dict[str, str],
-                 metadata: Dict[str, Any]):
+                 metadata_map: Dict[str, Any]):
         self.config = config
         self.dataset_config = dataset_config
         self.selected_dataset = selected_dataset
         self.columns_mapping = columns_mapping
-        self.metadata = metadata
+        self.metadata_map = metadata_map
 
     def upload_data(self, df: pd.DataFrame) -> None:
         object_type_val = self.dataset_config.get_object_type(self.selected_dataset)
-        metadata_map = build_metadata_map(self.metadata, self.config)
-        # Vervang eventuele inf, -inf en NaN-waarden door None
-        df_clean = df.replace([float("inf"), float("-inf"), float("nan")], None)
+        # Vervang eventuele inf en -inf waarden door NaN; alleen float-kolommen kunnen die bevatten.
+        # NaN wordt bij de conversie per kolom al omgezet naar None.
+        # Zonder float-kolommen is er niets te maskeren en is ook geen kopie van het DataFrame nodig.
+        float_columns = df.select_dtypes(include="floating").columns
+        df_clean = df.assign(**{col: df[col].where(np.isfinite(df[col])) for col in float_columns}) \
+            if len(float_columns) else df
         # st.write("Debug - DataFrame types:")
         # st.write(df_clean.dtypes)
         # st.write("\nDebug - Eerste rij raw values:")
         # st.write(df_clean.iloc[0])
-        data_to_send = self._prepare_data_to_send(df_clean, object_type_val, metadata_map)
+        data_to_send = self._prepare_data_to_send(df_clean, object_type_val, self.metadata_map)
         self._upload_to_vip(object_type_val, data_to_send)
 
     def _prepare_data_to_send(self, df: pd.DataFrame, object_type: str,
-                              metadata_map: Dict[str, Any]) -> List[Dict[str, Any]]:
+                              metadata_map: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Zet de rijen om naar API-objecten. De objecten worden pas per batch opgebouwd tijdens
+        de upload, zodat niet de volledige payload tegelijk in het geheugen staat.
+        """
         if "identifier" not in df.columns:
             st.warning("Geen 'identifier' kolom gevonden in het Excel-bestand. Deze wordt aangemaakt.")
             df['identifier'] = None
 
         type_mapper = DataTypeMapper(metadata_map)
-        data_to_send = []
 
         dataset_config_data = self.dataset_config.get_dataset_config(self.selected_dataset)
         parent_object_type = dataset_config_data.get("parentObjectType")
         parent_identifier_excel_column = dataset_config_data.get("parentIdentifier")
 
         # Extra debugging
-        print(f"[DEBUG] parent_object_type from config: {parent_object_type}")
-        print(f"[DEBUG] parent_identifier_excel_column from config: {parent_identifier_excel_column}")
-
-        for i, row in df.iterrows():
-            # Print de kolomkoppen alleen voor de eerste rij om logs te beperken
-            if i == 0:
-                print(f"[DEBUG] Excel column headers: {list(row.keys())}")
-
-            attributes = {}
-            for excel_col, api_field in self.columns_mapping.items():
-                original_value = row[excel_col]
-                field_metadata = metadata_map.get(api_field, {})
-                new_value = type_mapper.convert_value(original_value, field_metadata)
-                attributes[api_field] = new_value
-
+        logger.debug("parent_object_type from config: %s", parent_object_type)
+        logger.debug("parent_identifier_excel_column from config: %s", parent_identifier_excel_column)
+
+        logger.debug("Excel column headers: %s", list(df.columns))
+
+        # Converteer per kolom in plaats van per cel; de rijen worden daarna per object samengesteld
+        api_fields = list(self.columns_mapping.values())
+        converted_columns = [
+            type_mapper.convert_column(df[excel_col], metadata_map.get(api_field, {})).tolist()
+            for excel_col, api_field in self.columns_mapping.items()
+        ]
+        rows = zip(*converted_columns) if converted_columns else [()] * len(df)
+        identifiers = df["identifier"].astype(str).tolist()
+
+        if parent_object_type and parent_identifier_excel_column:
+            parents = self._get_parent_identifiers(df, parent_identifier_excel_column)
+        else:
+            parents = [None] * len(df)
+
+        return self._iter_objects(object_type, api_fields, identifiers, rows, parents, parent_object_type)
+
+    @staticmethod
+    def _iter_objects(object_type: str, api_fields: List[str], identifiers: List[str], rows: Iterable[tuple],
+                      parents: List[Optional[str]], parent_object_type: Optional[str]) -> Iterator[Dict[str, Any]]:
+        """Bouw de API-objecten één voor één op uit de geconverteerde kolommen."""
+        for identifier, values, parent in zip(identifiers, rows, parents):
             data_object = {
                 "objectType": object_type,
-                "identifier": str(row["identifier"]),
-                "attributes": attributes
+                "identifier": identifier,
+                "attributes": dict(zip(api_fields, values))
             }
-
-            if parent_object_type and parent_identifier_excel_column:
-                if parent_identifier_excel_column in row and pd.notna(row[parent_identifier_excel_column]):
-                    parent_identifier_value = row[parent_identifier_excel_column]
-                    data_object["parentObjectType"] = parent_object_type
-                    data_object["parentIdentifier"] = str(parent_identifier_value)
-                else:
-                    st.warning(f"De kolom '{parent_identifier_excel_column}' opgegeven als parentIdentifier is niet gevonden of leeg in het Excel-bestand.")
-
-            data_to_send.append(data_object)
-        return data_to_send
-
-    def _upload_to_vip(self, object_type: str, data_to_send: List[Dict[str, Any]]) -> None:
+            if parent is not None:
+                data_object["parentObjectType"] = parent_object_type
+                data_object["parentIdentifier"] = parent
+            yield data_object
+
+    def _get_parent_identifiers(self, df: pd.DataFrame, parent_identifier_excel_column: str) -> List[Optional[str]]:
+        """Geef per rij de parentIdentifier terug (None als die ontbreekt) en meld de rijen zonder parent."""
+        if parent_identifier_excel_column in df.columns:
+            parent_column = df[parent_identifier_excel_column]
+            parents = parent_column.astype(str).astype(object).where(parent_column.notna(), None).tolist()
+        else:
+            parents = [None] * len(df)
+
+        missing_parent_rows = [
+            {"row": row_index + 2, "identifier": identifier}
+            for row_index, identifier, parent in zip(df.index.tolist(), df["identifier"].astype(str).tolist(), parents)
+            if parent is None
+        ]
+
+        # Toon één melding voor alle rijen zonder parent, in plaats van één melding per rij
+        if missing_parent_rows:
+            st.warning(f"De kolom '{parent_identifier_excel_column}' opgegeven als parentIdentifier is niet gevonden of leeg in het Excel-bestand "
+                       f"({len(missing_parent_rows)} rijen).")
+            st.dataframe(pd.DataFrame(missing_parent_rows), hide_index=True)
+        return parents
+
+    def _upload_to_vip(self, object_type: str, data_to_send: Iterable[Dict[str, Any]]) -> None:
         try:
-
-            response = self.dataset_config.api_client.upsert_objects_in_batches(objects_data=data_to_send)
+            try:
+                response = self.dataset_config.api_client.upsert_objects_in_batches(objects_data=data_to_send)
+            finally:
+                # Ook een deels mislukte upload kan al batches hebben opgeslagen; downloads moeten de
+                # nieuwe data tonen
+                clear_download_cache()
             if response:
                 response_objects = response.get("objects", [])
                 failed_updates = [obj for obj in response_objects if not obj.get("success")]
@@ -301,18 +377,20 @@ class ExcelUploader:
 
         # Stap 2: Haal metadata op en bouw mappings
         step2 = ExcelUploadStep2(self.config, self.dataset_config)
-        metadata, columns_mapping, dtype_mapping, date_format_mapping = step2.get_metadata_and_mappings()
+        metadata, metadata_map, columns_mapping, dtype_mapping, date_format_mapping = \
+            self._get_metadata_and_mappings(step2)
         if not metadata:
             return
 
         # Stap 3: Lees het Excel-bestand in en converteer datumkolommen
         object_type = self.dataset_config.get_object_type(self.selected_dataset)
         step3 = ExcelUploadStep3(dtype_mapping, date_format_mapping, object_type)
-        df = step3.read_and_convert_excel(excel_file)
+        df = self._read_uploaded_excel(excel_file, step3)
         step3.show_preview(df)
 
         # Stap 4: Valideer de ingelezen Excel-data
-        step4 = ExcelUploadStep4(self.config, self.dataset_config, self.selected_dataset, columns_mapping, metadata)
+        step4 = ExcelUploadStep4(self.config, self.dataset_config, self.selected_dataset, columns_mapping, metadata,
+                                 metadata_map)
         if not step4.validate_excel(df):
             return
 
@@ -320,5 +398,42 @@ class ExcelUploader:
         if st.button("Upload naar VIP"):
             full_dataset_config = self.dataset_config.get_dataset_config(self.selected_dataset)
             step5 = ExcelUploadStep5(full_dataset_config, self.dataset_config, self.selected_dataset, columns_mapping,
-                                     metadata)
+                                     metadata_map)
             step5.upload_data(df)
+
+    def _get_metadata_and_mappings(self, step2: ExcelUploadStep2) -> Tuple[Dict[str, Any], Dict[str, Any],
+                                                                           Dict[str, str], Dict[str, Any],
+                                                                           Dict[str, Any]]:
+        """
+        Haal de metadata en mappings één keer per dataset en omgeving op en bewaar ze in de sessie.
+
+        Stap 2 loopt na een upload bij elke rerun opnieuw. Een treffer in st.cache_data geeft telkens
+        een nieuwe kopie van de metadata terug, waarna ook de mappings opnieuw opgebouwd worden.
+        Mislukte pogingen worden niet bewaard, zodat een volgende rerun het opnieuw probeert.
+        """
+        cache_key = (self.dataset_config.api_client.base_url, self.selected_dataset)
+        cached = st.session_state.get("upload_mappings")
+        if cached is None or cached[0] != cache_key:
+            result = step2.get_metadata_and_mappings()
+            if not result[0]:
+                return result
+            cached = (cache_key, result)
+            st.session_state["upload_mappings"] = cached
+        return cached[1]
+
+    def _read_uploaded_excel(self, excel_file, step3: ExcelUploadStep3) -> pd.DataFrame:
+        """
+        Lees het geüploade Excel-bestand één keer in en hergebruik het resultaat bij volgende reruns.
+
+        Streamlit voert het script opnieuw uit bij elke interactie (bijv. de knop "Upload naar VIP"),
+        waardoor het bestand anders telkens opnieuw geparsed zou worden. De sleutel bevat het
+        file_id van de upload: een opnieuw geüpload bestand met dezelfde naam en grootte krijgt
+        een nieuw id en wordt dus wel opnieuw ingelezen. Er wordt een kopie teruggegeven omdat
+        validatie en upload het DataFrame aanpassen.
+        """
+        cache_key = (self.dataset_config.api_client.base_url, self.selected_dataset, excel_file.file_id)
+        cached = st.session_state.get("uploaded_df")
+        if cached is None or cached[0] != cache_key:
+            cached = (cache_key, step3.read_and_convert_excel(excel_file))
+            st.session_state["uploaded_df"] = cached
+        return cached[1].copy()
@@ -0,0 +1,62 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.api_client import APIClient  # noqa: E402
+from utils.dataset_config import DatasetConfig  # noqa: E402
+
+# Testdataset met een verplichte en een optionele tekstkolom
+TEST_DATASET = {
+    "dataset": "Test Dataset",
+    "objectType": "Building",
+    "attributes": [
+        {"excelColumnName": "Naam", "AttributeName": "Naam"},
+        {"excelColumnName": "Omschrijving", "AttributeName": "Omschrijving"},
+    ],
+}
+
+TEST_METADATA = {
+    "objectTypes": [
+        {
+            "name": "Building",
+            "attributes": [
+                {"name": "Naam", "type": "STRING", "required": True},
+                {"name": "Omschrijving", "type": "STRING", "required": False},
+            ],
+        }
+    ]
+}
+
+
+@pytest.fixture
+def metadata() -> dict:
+    """Metadata zoals de API die voor de testdataset teruggeeft."""
+    return TEST_METADATA
+
+
+@pytest.fixture
+def api_client() -> APIClient:
+    """APIClient zonder echte omgeving; de tests versturen geen requests."""
+    client = APIClient("client-id", "client-secret", "https://api.test.invalid", "https://auth.test.invalid/token")
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def dataset_config(tmp_path, api_client) -> DatasetConfig:
+    """DatasetConfig met alleen de testdataset in een tijdelijke configuratiemap."""
+    config_folder = tmp_path / "dataset_config"
+    config_folder.mkdir()
+    (config_folder / "test_dataset.json").write_text(json.dumps(TEST_DATASET), encoding="utf-8")
+    return DatasetConfig(tmp_path, api_client)
+
+
+@pytest.fixture
+def dataset_name() -> str:
+    return TEST_DATASET["dataset"]
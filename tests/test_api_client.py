@@ -0,0 +1,50 @@
+import threading
+import time
+
+
+def _fake_upsert_batch(opgeslagen, lock, traag):
+    """Vervanger voor _upsert_batch die per identifier onthoudt welke versie als laatste is opgeslagen."""
+    def upsert_batch(url, batch, batch_num, total_batches, timeout, max_retries):
+        if batch_num in traag:
+            time.sleep(0.2)
+        with lock:
+            for obj in batch:
+                opgeslagen[obj["identifier"]] = obj["versie"]
+        return [{"identifier": obj["identifier"], "success": True} for obj in batch]
+    return upsert_batch
+
+
+def test_upsert_laatste_versie_van_dubbele_identifier_wint(monkeypatch, api_client):
+    opgeslagen = {}
+    monkeypatch.setattr(api_client, "_upsert_batch", _fake_upsert_batch(opgeslagen, threading.Lock(), traag={1}))
+    objects = [
+        {"identifier": "A", "versie": 1},
+        {"identifier": "B", "versie": 1},
+        {"identifier": "A", "versie": 2},
+    ]
+
+    result = api_client.upsert_objects_in_batches(objects, batch_size=1)
+
+    assert opgeslagen == {"A": 2, "B": 1}
+    assert [obj["identifier"] for obj in result["objects"]] == ["A", "B", "A"]
+
+
+def test_upsert_zonder_dubbele_identifiers_blijft_gelijktijdig(monkeypatch, api_client):
+    lopend, piek, lock = [0], [0], threading.Lock()
+
+    def upsert_batch(url, batch, batch_num, total_batches, timeout, max_retries):
+        with lock:
+            lopend[0] += 1
+            piek[0] = max(piek[0], lopend[0])
+        time.sleep(0.05)
+        with lock:
+            lopend[0] -= 1
+        return [{"identifier": obj["identifier"], "success": True} for obj in batch]
+
+    monkeypatch.setattr(api_client, "_upsert_batch", upsert_batch)
+    objects = [{"identifier": f"B{i}"} for i in range(8)]
+
+    result = api_client.upsert_objects_in_batches(objects, batch_size=1, max_workers=4)
+
+    assert result["totalCount"] == 8
+    assert piek[0] == 4
@@ -0,0 +1,91 @@
+from io import BytesIO
+
+import pandas as pd
+
+import handlers.excel_uploader as excel_uploader
+from handlers.excel_uploader import ExcelUploadStep2, ExcelUploadStep3, ExcelUploadStep4, ExcelUploadStep5
+from utils.excel_utils import ExcelHandler
+from utils.metadata_handler import DataTypeMapper
+from utils.validation import ExcelValidator
+
+
+def _excel_bestand(df: pd.DataFrame) -> BytesIO:
+    buffer = BytesIO()
+    df.to_excel(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def test_lege_stringcel_wordt_none_en_blijft_verplicht(monkeypatch, dataset_config, dataset_name, metadata):
+    monkeypatch.setattr(excel_uploader, "fetch_metadata", lambda api_client, object_type: metadata)
+    config = dataset_config.get_dataset_config(dataset_name)
+
+    # Stap 2 leest STRING-kolommen als string[pyarrow]; lege cellen worden dan pd.NA
+    _, metadata_map, columns_mapping, dtype_mapping, date_format_mapping = \
+        ExcelUploadStep2(config, dataset_config).get_metadata_and_mappings()
+    assert dtype_mapping["Naam"] == "string[pyarrow]"
+
+    excel_file = _excel_bestand(pd.DataFrame({
+        "objectType": ["Building", "Building"],
+        "identifier": ["B1", "B2"],
+        "Naam": ["Gebouw A", None],
+        "Omschrijving": [None, "Hoek"],
+    }))
+    df = ExcelUploadStep3(dtype_mapping, date_format_mapping, "Building").read_and_convert_excel(excel_file)
+    assert df["Naam"].isna().tolist() == [False, True]
+
+    validator = ExcelValidator(metadata=metadata_map, columns_mapping=columns_mapping, object_type="Building")
+    errors = validator.validate_excel(df)
+    assert [(e["row"], e["column"], e["error"]) for e in errors] == [
+        (3, "Naam", "Verplicht veld mag niet leeg zijn")
+    ]
+
+    # Stap 4 past het DataFrame in place aan; stap 5 moet de lege cellen als None versturen
+    step5 = ExcelUploadStep5(config, dataset_config, dataset_name, columns_mapping, metadata_map)
+    payload = list(step5._prepare_data_to_send(df, "Building", metadata_map))
+    assert [obj["attributes"] for obj in payload] == [
+        {"Naam": "Gebouw A", "Omschrijving": None},
+        {"Naam": None, "Omschrijving": "Hoek"},
+    ]
+
+
+def test_stap4_keurt_lege_verplichte_stringcel_af(dataset_config, dataset_name, metadata):
+    config = dataset_config.get_dataset_config(dataset_name)
+    metadata_map = {attr["name"]: attr for attr in metadata["objectTypes"][0]["attributes"]}
+    columns_mapping = config["__columns_mapping__"]
+    df = pd.DataFrame({
+        "objectType": ["Building"],
+        "identifier": ["B1"],
+        "Naam": pd.array([pd.NA], dtype="string[pyarrow]"),
+        "Omschrijving": pd.array(["Hoek"], dtype="string[pyarrow]"),
+    })
+
+    step4 = ExcelUploadStep4(config, dataset_config, dataset_name, columns_mapping, metadata,
+                             metadata_map)
+    assert step4.validate_excel(df) is False
+    assert df["Naam"].tolist() == [None]
+
+
+def test_download_datums_komen_ongewijzigd_terug_bij_upload():
+    # De download schrijft elke DATE (behalve yyyy) als dd-mm-jjjj, ook bij een yyyy-MM-dd veld;
+    # een dag <= 12 mag bij het terug inlezen niet als maand gelezen worden
+    field_metadata = {"type": "DATE", "dateFormat": "yyyy-MM-dd"}
+    data = [
+        {"objectType": "Building", "identifier": "B1", "attributes": {"Datum": "2020-05-01T00:00:00Z"}},
+        {"objectType": "Building", "identifier": "B2", "attributes": {"Datum": "2020-05-13T00:00:00Z"}},
+        {"objectType": "Building", "identifier": "B3", "attributes": {"Datum": "2020-04-30T23:00:00Z"}},
+    ]
+    excel_file = ExcelHandler({"Datum": field_metadata}, {"Datum": "Datum"}, "Building").create_excel_file(data)
+
+    step3 = ExcelUploadStep3({"Datum": str}, {"Datum": "yyyy-MM-dd"}, "Building")
+    df = step3.read_and_convert_excel(excel_file)
+
+    converted = DataTypeMapper({"Datum": field_metadata}).convert_column(df["Datum"], field_metadata)
+    assert converted.tolist() == ["2020-05-01", "2020-05-13", "2020-05-01"]
+
+
+def test_onbekend_datumformaat_wordt_niet_gegokt():
+    series = pd.Series(["2023-03-05", "05-03-2023", "2023-01-31 00:00:00", "03/05/2023", None])
+    dates = ExcelUploadStep3._parse_dates(series, "%Y-%m-%d")
+    assert dates.tolist()[:3] == [pd.Timestamp(2023, 3, 5), pd.Timestamp(2023, 3, 5), pd.Timestamp(2023, 1, 31)]
+    assert dates[3:].isna().all()
@@ -0,0 +1,33 @@
+import datetime
+
+from openpyxl import load_workbook
+
+from utils.excel_utils import DATE_NUM_FORMAT, DATETIME_NUM_FORMAT, ExcelHandler
+
+
+def test_create_excel_file_schrijft_waarden_zoals_to_excel():
+    columns_mapping = {"Tags": "Tags", "Waarde": "Waarde", "Datum": "Datum", "Dag": "Dag"}
+    metadata = {"Tags": {"type": "STRING"}, "Waarde": {"type": "STRING"}}
+    data = [
+        {"objectType": "Building", "identifier": "B1", "attributes": {
+            "Tags": ["a", "b"], "Waarde": float("inf"),
+            "Datum": datetime.datetime(2024, 5, 1, 12, 30), "Dag": datetime.date(2024, 5, 1)}},
+        {"objectType": "Building", "identifier": "B2", "attributes": {
+            "Tags": {"x": 1}, "Waarde": float("-inf"),
+            "Datum": datetime.datetime(2024, 5, 2), "Dag": None}},
+        {"objectType": "Building", "identifier": "B3", "attributes": {
+            "Tags": None, "Waarde": 1.5, "Datum": None, "Dag": datetime.date(2024, 5, 3)}},
+    ]
+
+    output = ExcelHandler(metadata, columns_mapping, "Building").create_excel_file(data)
+
+    sheet = load_workbook(output)["Data"]
+    rows = list(sheet.iter_rows(min_row=2, values_only=True))
+    assert rows == [
+        ("Building", "B1", "['a', 'b']", "inf", datetime.datetime(2024, 5, 1, 12, 30), datetime.datetime(2024, 5, 1)),
+        ("Building", "B2", "{'x': 1}", "-inf", datetime.datetime(2024, 5, 2), None),
+        ("Building", "B3", None, 1.5, None, datetime.datetime(2024, 5, 3)),
+    ]
+    assert sheet["E2"].number_format == DATETIME_NUM_FORMAT
+    assert sheet["F2"].number_format == DATE_NUM_FORMAT
+    assert sheet["C2"].number_format == "General"
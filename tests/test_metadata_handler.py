@@ -0,0 +1,16 @@
+import pandas as pd
+import pytest
+
+from utils.metadata_handler import DataTypeMapper
+
+
+@pytest.mark.parametrize("field_type", ["FLOAT", "INT"])
+def test_convert_column_hele_getallen_buiten_int64(field_type):
+    field_metadata = {"type": field_type}
+    series = pd.Series([1e20, -1e20, 3.0, None])
+    mapper = DataTypeMapper({})
+
+    converted = mapper.convert_column(series, field_metadata).tolist()
+
+    assert converted == [10 ** 20, -10 ** 20, 3, None]
+    assert converted == [mapper.convert_value(value, field_metadata) for value in series]
@@ -1,13 +1,101 @@
 import os
 import json
+import logging
+import random
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import requests
-from typing import Optional, List, Dict, Any, Union
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, List, Dict, Any, Iterable, Tuple, Union
 from dotenv import load_dotenv
 
+try:
+    # orjson serialiseert de request bodies en parseert de responses een stuk sneller dan de standaard json-module
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:  # orjson is optioneel
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    # json.loads accepteert ook bytes (UTF-8)
+    json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
 # Laad omgevingsvariabelen uit een .env-bestand (als dat aanwezig is)
 load_dotenv()
 
+# Vernieuw het token zoveel seconden voordat het verloopt, zodat lopende requests niet met
+# een net verlopen token verstuurd worden
+TOKEN_REFRESH_MARGIN = 300
+
+# HTTP-statussen die op tijdelijke drukte of storing wijzen; een batch wordt dan opnieuw verstuurd
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _transport_retry(methods: Iterable[str]) -> Retry:
+    """
+    Retry-beleid voor de HTTP-adapter: exponentiële backoff bij verbindingsfouten, rate limiting en
+    tijdelijke gatewayfouten, met respect voor Retry-After. Een 500 wordt niet herhaald; get_metadata
+    vangt die zelf af en de upload-batches hebben hun eigen retry-lus.
+    """
+    return Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUS_CODES - {500},
+        allowed_methods=frozenset(methods),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # geef de laatste response terug; raise_for_status meldt de fout zoals voorheen
+    )
+
+
+def _backoff_delay(retry: int, base: float = 5.0, cap: float = 60.0) -> float:
+    """
+    Bepaal de wachttijd voor poging 'retry' (0-based): exponentieel oplopend met jitter,
+    zodat gelijktijdige workers niet allemaal op hetzelfde moment opnieuw proberen.
+    """
+    delay = min(cap, base * 2 ** retry)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class RateLimiter:
+    """
+    Begrenst het aantal requests per tijdvenster (sliding window). Thread-safe, zodat de worker
+    threads van één client samen binnen het quotum van de API blijven.
+    """
+
+    def __init__(self, max_requests: int, period: float = 60.0) -> None:
+        self.max_requests = max_requests
+        self.period = period
+        self._timestamps: deque = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Wacht tot er binnen het venster ruimte is voor een nieuw request (0 = geen limiet)."""
+        if self.max_requests <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._timestamps and self._timestamps[0] <= now - self.period:
+                    self._timestamps.popleft()
+                if len(self._timestamps) < self.max_requests:
+                    self._timestamps.append(now)
+                    return
+                wait = self._timestamps[0] + self.period - now
+            time.sleep(wait)
+
+
+def _retry_after(response: Optional[requests.Response]) -> Optional[float]:
+    """Lees de Retry-After header (in seconden) uit een response, als die aanwezig is."""
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After", "")
+    return float(value) if value.strip().isdigit() else None
+
 
 class APIClient:
     """
@@ -20,7 +108,7 @@ class APIClient:
     """
 
     def __init__(self, client_id: str, client_secret: str,
-                 base_url: str, token_url: str) -> None:
+                 base_url: str, token_url: str, max_requests_per_minute: Optional[int] = None) -> None:
         """
         Initialiseer de APIClient met de benodigde client credentials en basis-URL.
 
@@ -29,6 +117,8 @@ class APIClient:
             client_secret (str): De Client Secret voor authenticatie.
             base_url (str): De basis-URL van de API.
                             Standaard: "https://api.accept.luxsinsights.com"
+            max_requests_per_minute (Optional[int]): Maximaal aantal requests per minuut naar de API.
+                            Standaard uit LUXS_MAX_REQUESTS_PER_MINUTE; 0 of niet ingesteld = geen limiet.
         """
         self.client_id = client_id
         self.client_secret = client_secret
@@ -36,6 +126,43 @@ class APIClient:
         self.token_url = token_url
         self.token: Optional[str] = None
         self.token_expires_at: float = 0.0  # Unix-timestamp waarop het token verloopt
+        self.token_refresh_at: float = 0.0  # Unix-timestamp waarop het token vernieuwd wordt
+        self._auth_headers: Dict[str, str] = {}  # Headers bij het huidige token; opnieuw opgebouwd in _get_token
+        # De client wordt gedeeld tussen sessies en worker threads; één thread tegelijk vernieuwt het token
+        self._token_lock = threading.Lock()
+
+        # Hergebruik de TCP/TLS-verbindingen naar de API tussen requests. De pool is groot genoeg
+        # voor de worker threads die pagina's en batches tegelijk versturen. Alleen GET-requests worden
+        # door de adapter herhaald; de POST van de upload-batches heeft een eigen retry-lus.
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=_transport_retry(["GET"]))
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        # Het ophalen van een token is veilig te herhalen, dus daar mag ook de POST opnieuw
+        self._session.mount(token_url, HTTPAdapter(max_retries=_transport_retry(["POST"])))
+
+        # Verdeel de requests over de tijd in plaats van het quotum in een burst op te maken
+        if max_requests_per_minute is None:
+            max_requests_per_minute = int(os.getenv("LUXS_MAX_REQUESTS_PER_MINUTE") or 0)
+        self._limiter = RateLimiter(max_requests_per_minute)
+
+        # Laatst ontvangen metadata per objecttype met de ETag, voor conditionele GET-requests
+        self._metadata_etags: Dict[Optional[str], Tuple[str, bytes]] = {}
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Verstuur een request via de gedeelde sessie, binnen de ingestelde rate limit."""
+        self._limiter.acquire()
+        return self._session.request(method, url, **kwargs)
+
+    def close(self) -> None:
+        """Sluit de onderliggende HTTP-sessie en de open verbindingen."""
+        self._session.close()
+
+    def __enter__(self) -> "APIClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def _get_token(self) -> None:
         """
@@ -46,9 +173,7 @@ class APIClient:
         """
         # Gebruik de productie endpoint voor het ophalen van het token
         token_url = self.token_url
-
-
-        print(f"DEBUG: token_url: {token_url}")
+        logger.debug("token_url: %s", token_url)
 
         data = {
             "grant_type": "client_credentials",
@@ -56,36 +181,46 @@ class APIClient:
             "client_secret": self.client_secret
         }
 
-        response = requests.post(token_url, data=data)
+        response = self._request("POST", token_url, data=data)
         response.raise_for_status()  # Gooi een error als de statuscode niet 200 is
 
         token_data = response.json()
         self.token = token_data["access_token"]
+        self._auth_headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/json"
+        }
         # 'expires_in' geeft de geldigheidsduur in seconden; gebruik 3600 als standaard
         expires_in = token_data.get("expires_in", 3600)
         self.token_expires_at = time.time() + expires_in
+        # Vernieuw ruim voor het verlopen; bij kortlevende tokens uiterlijk halverwege de geldigheid
+        self.token_refresh_at = time.time() + max(expires_in - TOKEN_REFRESH_MARGIN, expires_in / 2)
 
     def _ensure_token(self) -> None:
         """
         Zorg ervoor dat er een geldig token beschikbaar is.
 
-        Als het huidige token niet bestaat of verlopen is, wordt er een nieuw token opgehaald.
+        Als het huidige token niet bestaat of (bijna) verlopen is, wordt er een nieuw token opgehaald.
         """
-        if self.token is None or time.time() > self.token_expires_at:
-            self._get_token()
+        if self.token is not None and time.time() < self.token_refresh_at:
+            return
+        with self._token_lock:
+            # Een andere thread kan het token inmiddels vernieuwd hebben
+            if self.token is None or time.time() >= self.token_refresh_at:
+                self._get_token()
 
     def _headers(self) -> Dict[str, str]:
         """
         Bouw de HTTP-headers voor een API-request, inclusief de Authorization header.
 
+        De dictionary wordt per token één keer opgebouwd en gedeeld; pas hem niet aan, maar
+        maak een kopie (bijv. {**self._headers(), ...}) om headers toe te voegen.
+
         Returns:
             Dict[str, str]: Een dictionary met de benodigde HTTP-headers.
         """
         self._ensure_token()
-        return {
-            "Authorization": f"Bearer {self.token}",
-            "Accept": "application/json"
-        }
+        return self._auth_headers
 
     def test_client(self) -> Dict[str, str]:
         """
@@ -94,7 +229,6 @@ class APIClient:
         Returns:
             Dict[str, str]: De headers met een geldig OAuth2-token.
         """
-        self._ensure_token()
         return self._headers()
 
     def get_metadata(self, object_type: Optional[str] = None) -> Any:
@@ -112,22 +246,34 @@ class APIClient:
         if object_type:
             params["objectType"] = object_type
 
+        # Stuur de ETag van de vorige respons mee; bij ongewijzigde metadata antwoordt de API met 304 zonder body
+        headers = self._headers()
+        cached = self._metadata_etags.get(object_type)
+        if cached:
+            headers = {**headers, "If-None-Match": cached[0]}
+
         try:
-            response = requests.get(url, headers=self._headers(), params=params)
+            response = self._request("GET", url, headers=headers, params=params)
+            if response.status_code == 304 and cached:
+                return json_loads(cached[1])
 
             # Als er een 500-error optreedt en er is een objectType meegegeven, probeer dan opnieuw zonder filter
             if response.status_code == 500 and object_type:
-                print("[DEBUG] 500 error ontvangen, opnieuw proberen zonder objectType parameter...")
-                response = requests.get(url, headers=self._headers())
-                print(f"[DEBUG] Tweede poging status code: {response.status_code}")
+                logger.debug("500 error ontvangen, opnieuw proberen zonder objectType parameter...")
+                response = self._request("GET", url, headers=self._headers())
+                logger.debug("Tweede poging status code: %s", response.status_code)
+            else:
+                etag = response.headers.get("ETag")
+                if etag and response.ok:
+                    # Bewaar de ruwe body; elke aanroeper krijgt zo een eigen, vers geparseerde kopie
+                    self._metadata_etags[object_type] = (etag, response.content)
 
             response.raise_for_status()
-            return response.json()
+            return json_loads(response.content)
 
         except requests.exceptions.RequestException as e:
-            print(f"[ERROR] Request mislukt: {str(e)}")
-            print(f"[ERROR] URL geprobeerd: {url}")
-            print(f"[ERROR] Verzonden headers: {self._headers()}")
+            # De headers worden niet gelogd; daarin staat het access token
+            logger.error("Request mislukt: %s (URL: %s)", e, url)
             raise
 
     def get_objects(
@@ -162,53 +308,39 @@ class APIClient:
             "page": page,
             "pageSize": page_size,
         }
-        
-        print(f"Initial params: {params}")
-        
+
         # Handle filter_params if present in kwargs
         if 'filter_params' in kwargs:
-            print(f"Found filter_params in kwargs: {kwargs['filter_params']}")
             # Merge filter_params into params directly
             params.update(kwargs['filter_params'])
             del kwargs['filter_params']
-            print(f"Params after filter_params update: {params}")
-        
+
         # Handle cluster parameter specifically
         if 'cluster' in kwargs:
-            print(f"Found cluster in kwargs: {kwargs['cluster']}")
             # Convert list to single string if needed
             cluster_value = kwargs['cluster'][0] if isinstance(kwargs['cluster'], list) else kwargs['cluster']
             params["Cluster"] = cluster_value  # Note the capital C
             del kwargs['cluster']
-            print(f"Params after cluster handling: {params}")
-        
+
         # Add remaining kwargs
         params.update(kwargs)
-        print(f"Final params before attributes: {params}")
-        
+
         if attributes:
             params["attributes"] = attributes
         if identifier:
             params["identifier"] = identifier
 
-        print("\n=== DEBUG GET_OBJECTS ===")
-        print(f"Base URL: {self.base_url}")
-        print(f"Full URL before request: {url}")
-        print(f"Parameters:")
-        for key, value in params.items():
-            print(f"  {key}: {value} (type: {type(value)})")
-        print(f"Headers: {self._headers()}")
-        
-        response = requests.get(url, headers=self._headers(), params=params)
-        
-        print(f"Final URL after request: {response.url}")
-        print(f"Response status code: {response.status_code}")
+        logger.debug("get_objects %s met parameters: %s", url, params)
+
+        response = self._request("GET", url, headers=self._headers(), params=params)
+
+        logger.debug("Response status code %s voor %s", response.status_code, response.url)
         if response.status_code != 200:
-            print(f"Response error message: {response.text}")
-        
+            logger.debug("Response error message: %s", response.text)
+
         response.raise_for_status()
 
-        data = response.json()
+        data = json_loads(response.content)
         # Indien de API een lijst teruggeeft, wrapper deze dan in een dict
         if isinstance(data, list):
             return {
@@ -227,6 +359,7 @@ class APIClient:
             only_active: bool = False,
             page_size: int = 1000,
             st=None,
+            concurrency: int = 1,
             **kwargs  # Add this to accept additional filter parameters
     ) -> Dict[str, Any]:
         """
@@ -244,6 +377,8 @@ class APIClient:
             only_active (bool): Alleen actieve objecten ophalen.
             page_size (int): Aantal objecten per pagina.
             st: (Optioneel) Streamlit module voor visuele feedback.
+            concurrency (int): Aantal pagina's dat tegelijk (vooruit) wordt opgehaald. Pagina's na de
+                laatste komen leeg terug en worden genegeerd.
             **kwargs: Additional filter parameters to pass to get_objects.
 
         Returns:
@@ -267,32 +402,52 @@ class APIClient:
         all_objects = []
         current_page = 0
 
-        while True:
-            # Haal een pagina objecten op
-            resp = self.get_objects(
+        def fetch_page(page: int) -> Dict[str, Any]:
+            return self.get_objects(
                 object_type=object_type,
                 attributes=attributes,
                 identifier=identifier,
                 only_active=only_active,
-                page=current_page,
+                page=page,
                 page_size=page_size,
                 **kwargs  # Pass through the additional filter parameters
             )
 
-            current_page_objects = resp.get("objects", [])
-            all_objects.extend(current_page_objects)
-            print(f"[DEBUG] Ophalen duurde {time.time() - start_time:.2f} seconden")
-            print(f"[DEBUG] Ophalen pagina {current_page}, {len(current_page_objects)} objecten")
-            print(f"[DEBUG] Totaal aantal objecten nu: {len(all_objects)}")
-            feedback()
-
-            # Als er minder objecten zijn opgehaald dan 'page_size', is dit de laatste pagina
-            if len(current_page_objects) < page_size:
-                break
-
-            current_page += 1
-
-        print(f"[DEBUG] Ophalen van alle objecten duurde {time.time() - start_time:.2f} seconden")
+        # Houd 'concurrency' pagina's tegelijk onderweg en verwerk ze op volgorde;
+        # de Streamlit-feedback blijft zo in de hoofdthread.
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = deque(executor.submit(fetch_page, page) for page in range(concurrency))
+            next_page = concurrency
+            last_page = None  # Laatste pagina volgens de API ('totalPages'), als die wordt meegegeven
+            while pending:
+                resp = pending.popleft().result()
+
+                total_pages = resp.get("totalPages")
+                if isinstance(total_pages, int) and total_pages > 0:
+                    last_page = total_pages - 1
+
+                current_page_objects = resp.get("objects", [])
+                all_objects.extend(current_page_objects)
+                logger.debug(
+                    "Ophalen pagina %s, %s objecten (totaal nu %s, na %.2f seconden)",
+                    current_page, len(current_page_objects), len(all_objects), time.time() - start_time
+                )
+                feedback()
+
+                # Als er minder objecten zijn opgehaald dan 'page_size', is dit de laatste pagina
+                if len(current_page_objects) < page_size:
+                    for future in pending:
+                        future.cancel()
+                    break
+
+                current_page += 1
+                # Vraag geen pagina's voorbij de laatste pagina volgens de API speculatief op. Staat er niets
+                # meer uit terwijl deze pagina vol was, haal dan toch de volgende op ('totalPages' is een hint).
+                if last_page is None or next_page <= last_page or not pending:
+                    pending.append(executor.submit(fetch_page, next_page))
+                    next_page += 1
+
+        logger.debug("Ophalen van alle objecten duurde %.2f seconden", time.time() - start_time)
         return {
             "objects": all_objects,
             "totalCount": len(all_objects),
@@ -300,18 +455,25 @@ class APIClient:
         }
 
     def upsert_objects_in_batches(self,
-                       objects_data: List[Dict[str, Any]],
+                       objects_data: Iterable[Dict[str, Any]],
                        batch_size: int = 100,
                        timeout: int = 300,
-                       max_retries: int = 3) -> Any:
+                       max_retries: int = 3,
+                       max_workers: int = 4) -> Any:
         """
         Voegt objecten toe of werkt ze bij in batches, met een POST-request om timeouts te vermijden.
 
         Args:
-            objects_data (List[Dict[str, Any]]): Lijst met objectdefinities om toe te voegen of bij te werken.
+            objects_data (Iterable[Dict[str, Any]]): Objectdefinities om toe te voegen of bij te werken. Mag ook
+                een generator zijn; er wordt dan telkens maar één batch tegelijk opgebouwd.
             batch_size (int): Aantal objecten per batch (standaard 100).
             timeout (int): Timeout in seconden per request (standaard 300).
             max_retries (int): Maximaal aantal pogingen per batch (standaard 3).
+            max_workers (int): Aantal batches dat tegelijk verstuurd wordt (standaard 4).
+
+        Batches worden tegelijk verstuurd. Komt een identifier terug die ook in een batch staat die
+        nog onderweg is, dan wordt eerst gewacht tot alle lopende batches klaar zijn. Zo wint, net als
+        bij versturen op volgorde, altijd de laatste versie van een object in objects_data.
 
         Returns:
             Dict[str, Any]: Een dictionary met de gecombineerde resultaten van alle batches.
@@ -319,57 +481,93 @@ class APIClient:
         url = f"{self.base_url}/v1/objects"
         response_json_list = []
 
-        print(f"[DEBUG] Start upsert van {len(objects_data)} objecten in batches van {batch_size}")
-        print(f"[DEBUG] Timeout per request: {timeout} seconden")
-
-
-        # Verwerk de objecten in batches met retry-logica
-        for i in range(0, len(objects_data), batch_size):
-            batch = objects_data[i:i + batch_size]
-            batch_num = i // batch_size + 1
-            total_batches = (len(objects_data) + batch_size - 1) // batch_size  # Correcte berekening
-
-            for retry in range(max_retries):
-                try:
-                    print(f"[DEBUG] Verwerken batch {batch_num}/{total_batches} (poging {retry + 1}/{max_retries})")
-                    # Debug statement om de request body te tonen
-                    print(f"[DEBUG] Request body for batch {batch_num}:\n{json.dumps(batch, indent=2)}")
-                    response = requests.post(
-                        url,
-                        headers=self._headers(),
-                        json=batch,
-                        timeout=timeout
-                    )
-                    response.raise_for_status()
-
-                    resp_json = response.json()
-                    if isinstance(resp_json, list):
-                        response_json_list.extend(resp_json)
-                    else:
-                        response_json_list.append(resp_json)
-
-                    print(f"[DEBUG] Batch {batch_num} succesvol verwerkt: {len(batch)} objecten")
-                    break  # Ga naar de volgende batch als deze batch succesvol is verwerkt
-
-                except (requests.Timeout, requests.ConnectionError) as e:
-                    print(f"[WARNING] Timeout/Connectiefout bij batch {batch_num}, poging {retry + 1}: {str(e)}")
-                    if retry == max_retries - 1:
-                        print(f"[ERROR] Batch {batch_num} mislukt na {max_retries} pogingen")
-                        raise
-                    time.sleep(5 * (retry + 1))  # Wacht even (exponentiële backoff) voordat opnieuw geprobeerd wordt
-
-                except requests.RequestException as e:
-                    print(f"[ERROR] Fout bij verwerken batch {batch_num}: {str(e)}")
-                    print(f"[DEBUG] Response status: {e.response.status_code if hasattr(e, 'response') else 'Unknown'}")
-                    print(
-                        f"[DEBUG] Response content: {e.response.text[:200] if hasattr(e, 'response') else 'Unknown'}...")
-                    raise
+        # Bij een generator is het totaal vooraf niet bekend
+        total_objects = len(objects_data) if hasattr(objects_data, "__len__") else "?"
+        total_batches = (total_objects + batch_size - 1) // batch_size if total_objects != "?" else "?"
+        logger.debug("Start upsert van %s objecten in batches van %s (timeout per request: %s seconden)",
+                     total_objects, batch_size, timeout)
+
+        # Verwerk de objecten in batches met retry-logica. Er staan maximaal max_workers batches
+        # tegelijk uit; de resultaten worden in de volgorde van de batches verzameld.
+        objects_iter = iter(objects_data)
+        batch_num = 0
+        pending = deque()  # (future, identifiers) per lopende batch
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                while len(pending) < max_workers and (batch := list(islice(objects_iter, batch_size))):
+                    batch_num += 1
+                    identifiers = {obj.get("identifier") for obj in batch} - {None}
+                    # Een object dat ook in een lopende batch staat, pas versturen als die batches klaar zijn;
+                    # anders is niet te zeggen welke versie als laatste wordt opgeslagen
+                    if any(not identifiers.isdisjoint(pending_ids) for _, pending_ids in pending):
+                        logger.debug("Batch %s bevat identifiers uit een lopende batch; wacht op eerdere batches",
+                                     batch_num)
+                        while pending:
+                            response_json_list.extend(pending.popleft()[0].result())
+                    pending.append((executor.submit(
+                        self._upsert_batch, url, batch, batch_num, total_batches, timeout, max_retries
+                    ), identifiers))
+                if not pending:
+                    break
+                # Een fout in een batch wordt hier opnieuw opgegooid; er worden dan geen nieuwe batches meer gestart
+                response_json_list.extend(pending.popleft()[0].result())
 
         return {
             "objects": response_json_list,
             "totalCount": len(response_json_list)
         }
 
+    def _upsert_batch(self, url: str, batch: List[Dict[str, Any]], batch_num: int, total_batches: Any,
+                      timeout: int, max_retries: int) -> List[Any]:
+        """
+        Verstuur één batch naar de API, met retry bij timeouts en connectiefouten.
+
+        Returns:
+            List[Any]: De resultaten uit de response voor deze batch.
+        """
+        for retry in range(max_retries):
+            try:
+                logger.debug("Verwerken batch %s/%s (poging %s/%s)", batch_num, total_batches, retry + 1, max_retries)
+                # De volledige request body alleen serialiseren als er echt op debugniveau gelogd wordt
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Request body for batch %s:\n%s", batch_num, json.dumps(batch, indent=2))
+                response = self._request(
+                    "POST",
+                    url,
+                    headers={**self._headers(), "Content-Type": "application/json"},
+                    data=json_dumps(batch),
+                    timeout=timeout
+                )
+                response.raise_for_status()
+
+                resp_json = json_loads(response.content)
+                logger.debug("Batch %s succesvol verwerkt: %s objecten", batch_num, len(batch))
+                return resp_json if isinstance(resp_json, list) else [resp_json]
+
+            except (requests.Timeout, requests.ConnectionError) as e:
+                logger.warning("Timeout/Connectiefout bij batch %s, poging %s: %s", batch_num, retry + 1, e)
+                if retry == max_retries - 1:
+                    logger.error("Batch %s mislukt na %s pogingen", batch_num, max_retries)
+                    raise
+                time.sleep(_backoff_delay(retry))  # Wacht even (exponentiële backoff) voordat opnieuw geprobeerd wordt
+
+            except requests.RequestException as e:
+                response = e.response
+                status = response.status_code if response is not None else None
+                # Bij rate limiting of een tijdelijke serverfout opnieuw proberen, met de wachttijd van de server
+                if status in RETRY_STATUS_CODES and retry < max_retries - 1:
+                    wait = _retry_after(response)
+                    wait = _backoff_delay(retry) if wait is None else wait
+                    logger.warning("Status %s bij batch %s, poging %s; opnieuw over %.1f seconden",
+                                   status, batch_num, retry + 1, wait)
+                    time.sleep(wait)
+                    continue
+                logger.error("Fout bij verwerken batch %s: %s", batch_num, e)
+                if response is not None:
+                    logger.debug("Response status: %s, content: %s...", status, response.text[:200])
+                raise
+        return []
+
     def get_complexen(self) -> Optional[List[str]]:
 
         # complexen = self.get_all_objects(object_type="Building")
@@ -378,14 +576,11 @@ class APIClient:
 
         complex_list = []
         complexen = self.get_all_objects(object_type="Building").get("objects", [])
-        print(f"Amount of complexen: {len(complexen)}")
-        print(f"Type complexen: {type(complexen)}")
-        print(f"Complexen: {complexen[0]['attributes'].get('Description', 'No Description found')}")
+        logger.debug("Amount of complexen: %s", len(complexen))
         for complex in complexen:
             description = complex.get("attributes", {}).get("Description", "No 'Description' found")
             complex_list.append(description)
-        for complex in complex_list:
-            print(f"Complex: {complex}")
+        logger.debug("Complexen: %s", complex_list)
         return complex_list
         # for complex in complexen:
         #     print(f"Complex: {complex}")
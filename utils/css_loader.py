@@ -1,10 +1,23 @@
 import os
 import logging
+from functools import lru_cache
+
 import streamlit as st
 
 
-# Stel logging in op DEBUG-niveau voor extra informatie (voor ontwikkelaars)
-logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=4)
+def _read_css(css_path: str, mtime_ns: int) -> str:
+    """
+    Lees het CSS-bestand één keer per versie in en geef het als <style>-blok terug.
+    Volgende aanroepen (bijv. bij elke Streamlit rerun) worden uit de cache bediend; de
+    wijzigingstijd hoort bij de cachesleutel, zodat een aangepast bestand opnieuw gelezen wordt.
+    """
+    with open(css_path, 'rb') as file:
+        css_content = file.read().decode('utf-8')
+    return f'<style>{css_content}</style>'
 
 
 def load_css(current_dir):
@@ -13,27 +26,24 @@ def load_css(current_dir):
     Als het bestand niet gevonden wordt of er een fout optreedt bij het lezen,
     wordt er fallback CSS toegepast en wordt extra informatie getoond om te helpen bij het debuggen.
     """
-    # Bepaal de huidige directory en het pad naar het CSS-bestand
-
+    # Bepaal het pad naar het CSS-bestand
     css_path = os.path.join(current_dir, "assets", "css", "style.css")
 
-    # Controleer of het CSS-bestand bestaat
-    if os.path.exists(css_path):
-        try:
-            # Lees het CSS-bestand in
-            with open(css_path, 'r', encoding='utf-8') as file:
-                css_content = file.read()
-            # Pas de CSS styling toe in de Streamlit app
-            st.markdown(f'<style>{css_content}</style>', unsafe_allow_html=True)
-            logging.debug("CSS is succesvol geladen en toegepast.")
-        except Exception as error:
-            # Toon een foutmelding als er een probleem is bij het lezen van het bestand
-            st.error(f"Fout bij het lezen van het CSS-bestand: {error}")
-            logging.error(f"CSS leesfout: {error}", exc_info=True)
-    else:
-        # Als het CSS-bestand niet gevonden is, toon een foutmelding en de directorystructuur
+    try:
+        # Pas de (gecachete) CSS styling toe in de Streamlit app
+        st.markdown(_read_css(css_path, os.stat(css_path).st_mtime_ns), unsafe_allow_html=True)
+        logger.debug("CSS is succesvol geladen en toegepast.")
+    except FileNotFoundError:
+        # Als het CSS-bestand niet gevonden is, toon een foutmelding
         st.error(f"CSS-bestand niet gevonden op: {css_path}")
 
+        # Log de inhoud van de app-map om te helpen bij het debuggen (alleen op dit foutpad)
+        try:
+            with os.scandir(current_dir) as entries:
+                logger.debug("Inhoud van %s: %s", current_dir, sorted(entry.name for entry in entries))
+        except OSError as error:
+            logger.debug("Kan de inhoud van %s niet weergeven: %s", current_dir, error)
+
         # Pas fallback CSS styling toe zodat de app er toch redelijk uitziet
         st.warning("Fallback CSS styling wordt toegepast...")
         st.markdown("""
@@ -50,4 +60,7 @@ def load_css(current_dir):
                 }
             </style>
         """, unsafe_allow_html=True)
-
+    except Exception as error:
+        # Toon een foutmelding als er een probleem is bij het lezen van het bestand
+        st.error(f"Fout bij het lezen van het CSS-bestand: {error}")
+        logger.error("CSS leesfout: %s", error, exc_info=True)
@@ -1,5 +1,5 @@
-import json
 import logging
+import os
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
@@ -7,8 +7,13 @@ import streamlit as st
 
 from utils.api_client import APIClient
 
-# Stel logging in op DEBUG-niveau zodat we uitgebreide informatie krijgen tijdens het uitvoeren van de code.
-logging.basicConfig(level=logging.DEBUG)
+try:
+    # orjson parseert bytes direct en is een stuk sneller dan de standaard json-module
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optioneel
+    from json import loads as json_loads
+
+logger = logging.getLogger(__name__)
 
 
 def initialize_config_folder(project_root: Union[str, Path]) -> Path:
@@ -27,27 +32,27 @@ def initialize_config_folder(project_root: Union[str, Path]) -> Path:
     config_folder = project_root / "dataset_config"
 
     # Log informatie over de project root en het pad naar de configuratiemap
-    logging.debug(f"Project root: {project_root}")
-    logging.debug(f"Config folder path: {config_folder}")
+    logger.debug("Project root: %s", project_root)
+    logger.debug("Config folder path: %s", config_folder)
 
     # Als de configuratiemap niet bestaat, maak deze dan aan
     if not config_folder.exists():
         try:
-            logging.debug("Configuratiemap bestaat niet. Wordt aangemaakt...")
+            logger.debug("Configuratiemap bestaat niet. Wordt aangemaakt...")
             config_folder.mkdir(parents=True, exist_ok=True)
-            logging.debug(f"Configuratiemap succesvol aangemaakt op: {config_folder}")
+            logger.debug("Configuratiemap succesvol aangemaakt op: %s", config_folder)
         except Exception as e:
             st.error(f"Fout bij het aanmaken van de configuratiemap: {e}")
     else:
         # Als de map al bestaat, log dan de inhoud van de map
-        logging.debug("Configuratiemap bestaat. Inhoud van de map:")
+        logger.debug("Configuratiemap bestaat. Inhoud van de map:")
         try:
             for item in config_folder.iterdir():
                 # Bepaal of het item een map of een bestand is
                 item_type = "Map" if item.is_dir() else "Bestand"
-                logging.debug(f"- {item.name} ({item_type})")
+                logger.debug("- %s (%s)", item.name, item_type)
         except Exception as e:
-            logging.error(f"Fout bij het weergeven van de inhoud van de configuratiemap: {e}")
+            logger.error("Fout bij het weergeven van de inhoud van de configuratiemap: %s", e)
 
     return config_folder
 
@@ -76,6 +81,13 @@ class DatasetConfig:
         self.config_folder = initialize_config_folder(self.project_root)
         self.api_client = api_client
 
+        # Lees alle configuraties één keer in en bouw een index op datasetnaam,
+        # zodat de opvraagmethoden hieronder geen schijf-I/O meer doen.
+        self._configs = self._load_configs()
+        self._by_name: Dict[str, Dict[str, Any]] = {
+            cfg["dataset"]: cfg for cfg in self._configs if "dataset" in cfg
+        }
+
     def _load_configs(self) -> List[Dict[str, Any]]:
         """
         Laad alle JSON-configuratiebestanden uit de configuratiemap.
@@ -83,16 +95,27 @@ class DatasetConfig:
         :return: Een lijst van dictionaries, waarbij elk dictionary één configuratie voorstelt.
         """
         configs = []
-        # Zoek naar alle .json bestanden in de configuratiemap
-        for config_file in self.config_folder.glob("*.json"):
-            try:
-                # Lees de inhoud van het JSON-bestand en zet deze om in een dictionary
-                data = json.loads(config_file.read_text(encoding="utf-8"))
-                # Voeg de bestandsnaam (zonder extensie) toe aan de dictionary voor later gebruik
-                data["__filename__"] = config_file.stem
-                configs.append(data)
-            except Exception as e:
-                logging.error(f"Fout bij het lezen van configuratiebestand {config_file}: {e}")
+        # Zoek naar alle .json bestanden in de configuratiemap (scandir levert het bestandstype zonder extra stat)
+        with os.scandir(self.config_folder) as entries:
+            for entry in entries:
+                if not (entry.is_file() and entry.name.endswith(".json")):
+                    continue
+                try:
+                    # Lees de inhoud van het JSON-bestand en zet deze om in een dictionary
+                    with open(entry.path, "rb") as config_file:
+                        data = json_loads(config_file.read())
+                    # Voeg de bestandsnaam (zonder extensie) toe aan de dictionary voor later gebruik
+                    data["__filename__"] = os.path.splitext(entry.name)[0]
+                    # Leid de attribuutnamen en de kolommapping één keer af, zodat ze niet bij elke
+                    # download of upload opnieuw uit de lijst 'attributes' opgebouwd hoeven te worden
+                    attributes = data.get("attributes", [])
+                    data["__attribute_names__"] = [attr["AttributeName"] for attr in attributes]
+                    data["__columns_mapping__"] = {
+                        attr["excelColumnName"]: attr["AttributeName"] for attr in attributes
+                    }
+                    configs.append(data)
+                except Exception as e:
+                    logger.error("Fout bij het lezen van configuratiebestand %s: %s", entry.path, e)
         return configs
 
     def get_available_datasets(self) -> List[str]:
@@ -101,12 +124,8 @@ class DatasetConfig:
 
         :return: Een lijst met dataset namen.
         """
-        configs = self._load_configs()
-        # Haal uit elke configuratie de waarde op van de sleutel "dataset" (indien aanwezig)
-        datasets = [cfg.get("dataset") for cfg in configs if "dataset" in cfg]
         # Haal "Complex Namen" uit de lijst van datasets
-        datasets = [dataset for dataset in datasets if dataset != "Complex Namen"]
-        return datasets
+        return [dataset for dataset in self._by_name if dataset != "Complex Namen"]
 
     def get_dataset_config(self, dataset_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -115,10 +134,7 @@ class DatasetConfig:
         :param dataset_name: De naam van de dataset.
         :return: De configuratie als dictionary, of None als deze niet gevonden is.
         """
-        for cfg in self._load_configs():
-            if cfg.get("dataset") == dataset_name:
-                return cfg
-        return None
+        return self._by_name.get(dataset_name)
 
     def get_object_type(self, dataset_name: str) -> Optional[str]:
         """
@@ -127,10 +143,8 @@ class DatasetConfig:
         :param dataset_name: De naam van de dataset.
         :return: Het objecttype als string, of None als niet gevonden.
         """
-        for cfg in self._load_configs():
-            if cfg.get("dataset") == dataset_name:
-                return cfg.get("objectType")
-        return None
+        cfg = self._by_name.get(dataset_name)
+        return cfg.get("objectType") if cfg else None
 
     def get_file_name(self, dataset_name: str) -> Optional[str]:
         """
@@ -139,7 +153,5 @@ class DatasetConfig:
         :param dataset_name: De naam van de dataset.
         :return: De bestandsnaam als string, of None als niet gevonden.
         """
-        for cfg in self._load_configs():
-            if cfg.get("dataset") == dataset_name:
-                return cfg.get("__filename__")
-        return None
+        cfg = self._by_name.get(dataset_name)
+        return cfg.get("__filename__") if cfg else None
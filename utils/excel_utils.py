@@ -1,13 +1,22 @@
+import datetime
 import io
 import logging
 import re
-from typing import Any, Dict, List, Optional
+from itertools import zip_longest
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_bool, is_float, is_integer
 from xlsxwriter.workbook import Workbook
 from io import BytesIO
 
 logger = logging.getLogger(__name__)
 
+# Getalnotaties voor datum- en tijdsduurcellen, gelijk aan de standaard van df.to_excel
+DATETIME_NUM_FORMAT = "YYYY-MM-DD HH:MM:SS"
+DATE_NUM_FORMAT = "YYYY-MM-DD"
+TIMEDELTA_NUM_FORMAT = "0"
+
 
 def sanitize_name(name: str) -> str:
     """
@@ -31,6 +40,40 @@ def sanitize_name(name: str) -> str:
     return cleaned[:255]
 
 
+def excel_cell_value(value: Any) -> Tuple[Any, Optional[str]]:
+    """
+    Zet een waarde om naar een waarde die xlsxwriter kan schrijven, met de bijbehorende getalnotatie.
+
+    Volgt de conversie van df.to_excel: lege waarden worden None (lege cel), inf wordt de tekst
+    'inf'/'-inf', datums krijgen een datumnotatie en overige objecten (bijv. lijsten) worden tekst.
+
+    Args:
+        value (Any): De waarde uit het DataFrame.
+
+    Returns:
+        Tuple[Any, Optional[str]]: De te schrijven waarde en de getalnotatie (of None).
+    """
+    if value is None or isinstance(value, str):
+        return value, None
+    if is_bool(value):
+        return bool(value), None
+    if is_integer(value):
+        return int(value), None
+    if is_float(value):
+        if np.isnan(value):
+            return None, None
+        if np.isinf(value):
+            return ("inf" if value > 0 else "-inf"), None
+        return float(value), None
+    if isinstance(value, datetime.datetime):
+        return (None, None) if pd.isna(value) else (value, DATETIME_NUM_FORMAT)
+    if isinstance(value, datetime.date):
+        return value, DATE_NUM_FORMAT
+    if isinstance(value, datetime.timedelta):
+        return (None, None) if pd.isna(value) else (value.total_seconds() / 86400, TIMEDELTA_NUM_FORMAT)
+    return str(value), None
+
+
 def set_column_widths(worksheet: Any,
                       df: pd.DataFrame,
                       min_width: int = 8,
@@ -105,6 +148,9 @@ class ExcelHandler:
         self.object_type = object_type
         self.skip_identifier_insert = False
 
+        # Het DataFrame zoals het laatst naar Excel is geschreven (handig voor een preview)
+        self.dataframe: Optional[pd.DataFrame] = None
+
         # De vereiste kolommen: altijd objectType en identifier, plus alle interne attributen
         self.required_columns = ["objectType", "identifier"] + list(columns_mapping.values())
 
@@ -140,10 +186,10 @@ class ExcelHandler:
             output = io.BytesIO()
 
         # Debug info over de data
-        logger.debug(f"Aantal records in data: {len(data)}")
-        logger.debug(f"Type van data: {type(data)}")
+        logger.debug("Aantal records in data: %s", len(data))
+        logger.debug("Type van data: %s", type(data))
         if data:
-            logger.debug(f"Eerste object: {data[0]}")
+            logger.debug("Eerste object: %s", data[0])
 
         # Zet data om naar DataFrame
         df = pd.DataFrame(data)
@@ -153,9 +199,12 @@ class ExcelHandler:
         if 'identifier' in df.columns:
             original_identifier = df['identifier'].copy()
 
-        # Klap eventuele 'attributes' kolom uit naar losse kolommen
+        # Klap eventuele 'attributes' kolom uit naar losse kolommen. Eén DataFrame uit de lijst met
+        # dicts is veel sneller dan apply(pd.Series) per rij; alleen de gemapte attributen blijven over.
         if 'attributes' in df.columns:
-            df_attr = df['attributes'].apply(pd.Series)
+            records = [attrs if isinstance(attrs, dict) else {} for attrs in df['attributes'].tolist()]
+            df_attr = pd.DataFrame(records, index=df.index)
+            df_attr = df_attr[[col for col in df_attr.columns if col in self.inverse_mapping]]
             df = df.drop(columns=['attributes']).join(df_attr)
 
         # Voeg objectType kolom toe als die niet bestaat
@@ -255,28 +304,48 @@ class ExcelHandler:
                 rename_map[c] = excel_col
         df.rename(columns=rename_map, inplace=True)
 
-        # Debug info over het eindresultaat
-        logger.debug(f"Finale kolommen in DataFrame: {df.columns.tolist()}")
-        if len(df) > 0:
-            logger.debug(f"Eerste rij van finale data: {df.iloc[0].to_dict()}")
-        else:
-            logger.debug("Geen data in de DataFrame na verwerking.")
+        # Debug info over het eindresultaat (alleen opbouwen als debug-logging aan staat)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Finale kolommen in DataFrame: %s", df.columns.tolist())
+            if len(df) > 0:
+                logger.debug("Eerste rij van finale data: %s", df.iloc[0].to_dict())
+            else:
+                logger.debug("Geen data in de DataFrame na verwerking.")
 
-        # Schrijf DataFrame naar Excel
-        writer = pd.ExcelWriter(output, engine="xlsxwriter")
-        df.to_excel(writer, index=False, sheet_name="Data")
+        # Bewaar het eindresultaat zodat een preview niet opnieuw uit de Excel gelezen hoeft te worden
+        self.dataframe = df
+
+        # Schrijf het Excel-bestand in constant_memory modus: xlsxwriter houdt dan alleen de
+        # huidige rij in het geheugen. Rijen moeten daarvoor wel op volgorde geschreven worden,
+        # dus eerst de header (rij 0, via format_excel_sheet) en daarna de data rij voor rij.
+        # strings_to_urls staat uit: waarden blijven gewone tekst en niet elke string wordt op URL's gecontroleerd.
+        workbook = Workbook(output, {"constant_memory": True, "strings_to_urls": False})
+        worksheet = workbook.add_worksheet("Data")
 
         # Format en style het Excel bestand
         self.format_excel_sheet(
-            workbook=writer.book,
-            worksheet=writer.sheets["Data"],
+            workbook=workbook,
+            worksheet=worksheet,
             df=df,
             metadata=self.metadata,
             columns_mapping=self.columns_mapping
         )
 
+        # Schrijf de waarden zoals df.to_excel dat doet (zie excel_cell_value); lege waarden worden
+        # een lege cel. Alleen datumcellen krijgen een opmaak, die per notatie één keer wordt aangemaakt.
+        cell_formats = {
+            num_format: workbook.add_format({"num_format": num_format})
+            for num_format in (DATETIME_NUM_FORMAT, DATE_NUM_FORMAT, TIMEDELTA_NUM_FORMAT)
+        }
+        values = df.astype(object).where(df.notna(), None)
+        for row_num, row in enumerate(values.itertuples(index=False, name=None), start=1):
+            for col_num, raw_value in enumerate(row):
+                value, num_format = excel_cell_value(raw_value)
+                if value is not None:
+                    worksheet.write(row_num, col_num, value, cell_formats.get(num_format))
+
         # Afronden en terug naar het begin van de BytesIO buffer
-        writer.close()
+        workbook.close()
         output.seek(0)
         return output
 
@@ -321,10 +390,10 @@ class ExcelHandler:
         # Maak een lookup sheet voor enumeraties en boolean waardes
         lookup_sheet = workbook.add_worksheet("Lookup_Lists")
 
-        # Boolean opties toevoegen
+        # Boolean opties toevoegen. De lookup-lijsten worden per kolom verzameld en pas aan het eind
+        # rij voor rij weggeschreven (constant_memory vereist schrijven op rijvolgorde).
         boolean_options = ["Ja", "Nee"]
-        for i, opt in enumerate(boolean_options):
-            lookup_sheet.write(i, 0, opt)
+        lookup_columns = [boolean_options]
         workbook.define_name("BooleanList", "='Lookup_Lists'!$A$1:$A$2")
 
         # Inverse mapping voor eenvoudige lookup van interne keys
@@ -345,8 +414,7 @@ class ExcelHandler:
                 options = field_meta['attributeValueOptions']
                 list_name = sanitize_name(internal_key)
                 if list_name not in created_named_ranges and options:
-                    for row_i, val in enumerate(options):
-                        lookup_sheet.write(row_i, enum_col, val)
+                    lookup_columns.append(options)
                     col_letter = chr(ord('A') + enum_col)
                     workbook.define_name(
                         list_name,
@@ -356,6 +424,9 @@ class ExcelHandler:
                     enum_col += 1
                     created_named_ranges.add(list_name)
 
+        for row_i, lookup_row in enumerate(zip_longest(*lookup_columns)):
+            lookup_sheet.write_row(row_i, 0, lookup_row)
+
         # Datavalidatie toepassen
         start_row = 1
         end_row = start_row + len(df) - 1
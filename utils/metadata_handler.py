@@ -1,12 +1,39 @@
 import logging
 from typing import Any, Dict, List, Optional, Union
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 from datetime import datetime
 
-# Configureer de logging module zodat debug-informatie zichtbaar wordt
-logging.basicConfig(level=logging.DEBUG)
+from utils.api_client import APIClient
+
+logger = logging.getLogger(__name__)
+
+
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={APIClient: lambda client: client.base_url})
+def fetch_metadata(api_client: APIClient, object_type: str) -> Dict[str, Any]:
+    """
+    Haalt de metadata van een objecttype op via de API en cachet het resultaat.
+
+    De cache is gekoppeld aan de base URL van de client, zodat Accept en Production
+    elk hun eigen metadata houden. Herhaalde aanroepen binnen het uur (bijv. eerst
+    downloaden en daarna uploaden) kosten zo geen extra HTTP-verzoek.
+
+    Parameters:
+        api_client (APIClient): De client waarmee de metadata wordt opgehaald.
+        object_type (str): De naam van het gewenste objecttype.
+
+    Returns:
+        dict: De metadata zoals teruggegeven door de API, aangevuld met een index
+        '__object_types_by_name__' op objecttype-naam.
+    """
+    metadata = api_client.get_metadata(object_type)
+    # Leg de index mee in de cache, zodat get_object_type_data niet telkens de lijst hoeft te doorzoeken
+    metadata["__object_types_by_name__"] = {
+        ot.get("name"): ot for ot in metadata.get("objectTypes", [])
+    }
+    return metadata
 
 
 def get_object_type_data(metadata: Dict[str, Any], object_type: str) -> Dict[str, Any]:
@@ -23,10 +50,10 @@ def get_object_type_data(metadata: Dict[str, Any], object_type: str) -> Dict[str
     Raises:
         ValueError: Als het objecttype niet gevonden wordt.
     """
-    ot_data = next(
-        (ot for ot in metadata.get("objectTypes", []) if ot.get("name") == object_type),
-        None
-    )
+    ot_by_name = metadata.get("__object_types_by_name__")
+    if ot_by_name is None:
+        ot_by_name = {ot.get("name"): ot for ot in metadata.get("objectTypes", [])}
+    ot_data = ot_by_name.get(object_type)
     if not ot_data:
         raise ValueError(f"Object type {object_type} niet gevonden in metadata")
     return ot_data
@@ -76,6 +103,25 @@ def map_config_attributes_to_metadata(
     return meta_map
 
 
+def get_columns_mapping(config: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Bouwt de mapping van Excel-kolomnamen naar API-veldnamen voor een datasetconfiguratie.
+
+    Parameters:
+        config (dict): De configuratie met de lijst 'attributes'.
+
+    Returns:
+        dict: Mapping van 'excelColumnName' naar 'AttributeName'.
+    """
+    # DatasetConfig rekent de mapping al uit bij het inlezen van de configuratie
+    if "__columns_mapping__" in config:
+        return config["__columns_mapping__"]
+    return {
+        attr["excelColumnName"]: attr["AttributeName"]
+        for attr in config.get("attributes", [])
+    }
+
+
 def build_metadata_map(metadata: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
     """
     Bouwt een mapping op van metadata voor elk attribuut zoals gespecificeerd in de configuratie.
@@ -99,6 +145,16 @@ def build_metadata_map(metadata: Dict[str, Any], config: Dict[str, Any]) -> Dict
     # Koppel de attributen uit de configuratie aan de bijbehorende metadata
     return map_config_attributes_to_metadata(config.get("attributes", []), attribute_mapping)
 
+# Vertaling van de dateFormat uit de API-metadata naar een strftime-formaat
+DATE_FORMATS = {
+    "dd-MM-yyyy": "%d-%m-%Y",
+    "yyyy-MM-dd": "%Y-%m-%d",
+}
+
+# Hele getallen vanaf deze grens passen niet in int64 en worden per waarde met int() omgezet
+INT64_LIMIT = 2.0 ** 63
+
+
 class DataTypeMapper:
     """
     Class responsible for converting values between Excel and API formats based on metadata.
@@ -131,6 +187,83 @@ class DataTypeMapper:
         else:
             return self._convert_string(value)
 
+    def convert_column(self, series: pd.Series, field_metadata: Dict[str, Any]) -> pd.Series:
+        """
+        Convert a complete column based on its metadata type and format.
+
+        Vectorized counterpart of convert_value: the type dispatch happens once per
+        column instead of once per cell. Empty values become None.
+
+        Args:
+            series: Column to convert
+            field_metadata: Metadata for this field from the API
+        """
+        field_type = field_metadata.get("type", "").upper()
+
+        if field_type == "DATE":
+            converted = self._convert_date_column(series, field_metadata.get("dateFormat"))
+        elif field_type == "INT":
+            converted = self._convert_int_column(series)
+        elif field_type == "FLOAT":
+            converted = self._convert_float_column(series)
+        else:
+            converted = self._convert_string_column(series)
+
+        return converted.where(series.notna(), None)
+
+    def _convert_date_column(self, series: pd.Series, date_format: Optional[str]) -> pd.Series:
+        """Convert a column to the specified date format; unparseable values become None."""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            dates = series
+        else:
+            # 'mixed' parses every value on its own, just like pd.to_datetime(value) per cell
+            dates = pd.to_datetime(series, errors="coerce", format="mixed")
+
+        if date_format == "yyyy":
+            formatted = dates.dt.year.astype("Int64").astype(str)
+        elif date_format in DATE_FORMATS:
+            formatted = dates.dt.strftime(DATE_FORMATS[date_format])
+        else:
+            # Add 1 hour for timezone and format as per API requirements.
+            formatted = (dates + pd.Timedelta(hours=1)).dt.strftime("%d-%m-%Y %H:%M:%S")
+
+        return formatted.astype(object).where(dates.notna(), None)
+
+    def _convert_int_column(self, series: pd.Series) -> pd.Series:
+        """Convert a column to integers (truncated, like int(float(value)))."""
+        numeric = pd.to_numeric(series, errors="coerce")
+        numeric = numeric.where(np.isfinite(numeric))
+        return self._whole_numbers_to_int(np.trunc(numeric)).where(numeric.notna(), None)
+
+    def _convert_float_column(self, series: pd.Series) -> pd.Series:
+        """Convert a column to float/integer; non-numeric values are kept as string."""
+        numeric = pd.to_numeric(series, errors="coerce")
+        is_number = numeric.notna()
+        is_whole = is_number & np.isfinite(numeric) & (numeric % 1 == 0)
+
+        converted = series.astype(str).astype(object)
+        converted[is_number] = numeric[is_number].astype(str)
+        # Return as integer if it's a whole number
+        converted[is_whole] = self._whole_numbers_to_int(numeric[is_whole])
+        return converted
+
+    @staticmethod
+    def _whole_numbers_to_int(numbers: pd.Series) -> pd.Series:
+        """
+        Convert whole numbers to Python ints, like int(value) per cell. Values within the int64
+        range go through Int64 in one pass; larger values (e.g. 1e20) are converted one by one.
+        Missing values stay missing.
+        """
+        in_range = (numbers.abs() < INT64_LIMIT) | numbers.isna()
+        ints = numbers.where(in_range).astype("Int64").astype(object)
+        if not in_range.all():
+            ints[~in_range] = numbers[~in_range].map(int)
+        return ints
+
+    def _convert_string_column(self, series: pd.Series) -> pd.Series:
+        """Convert a column to string."""
+        return series.astype(str).astype(object)
+
     def _convert_date(self, value: Any, date_format: Optional[str]) -> Optional[str]:
         """Convert a value to the specified date format."""
         try:
@@ -141,17 +274,15 @@ class DataTypeMapper:
             # Format according to specified format
             if date_format == "yyyy":
                 return str(value.year)
-            elif date_format == "dd-MM-yyyy":
-                return value.strftime("%d-%m-%Y")
-            elif date_format == "yyyy-MM-dd":
-                return value.strftime("%Y-%m-%d")
+            elif date_format in DATE_FORMATS:
+                return value.strftime(DATE_FORMATS[date_format])
             else:
                 # Add 1 hour for timezone and format as per API requirements.
                 adjusted_value = value + pd.Timedelta(hours=1)
                 return adjusted_value.strftime("%d-%m-%Y %H:%M:%S")
 
         except Exception as e:
-            st.write(f"Error converting date value {value}: {e}")
+            logger.warning("Error converting date value %s: %s", value, e)
             return None
 
     def _convert_int(self, value: Any) -> Optional[int]:
@@ -159,7 +290,7 @@ class DataTypeMapper:
         try:
             return int(float(value))
         except (ValueError, TypeError):
-            st.write(f"Error converting {value} to integer")
+            logger.warning("Error converting %s to integer", value)
             return None
 
     def _convert_float(self, value: Any) -> Union[int, str]:
@@ -1,6 +1,17 @@
+import logging
 from typing import Dict, List, Tuple, Union, Any
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
+# Foutmeldingen per datatype voor de typevalidatie
+TYPE_ERROR_MESSAGES = {
+    "STRING": ("Waarde moet een tekst zijn", "string"),
+    "NUMBER": ("Waarde moet een geheel getal zijn", "geheel getal"),
+    "BOOLEAN": ("Waarde moet Ja, Nee of leeg zijn", "Ja, Nee of leeg"),
+    "DATE": ("Waarde moet een geldige datum zijn", "datum (bijv. 01-01-2023)")
+}
+
 class ExcelValidator:
     def __init__(self, metadata: dict, columns_mapping: dict, object_type: str):
         self.metadata = metadata
@@ -8,6 +19,16 @@ class ExcelValidator:
         self.reverse_mapping = {v: k for k, v in columns_mapping.items()}
         self.object_type = object_type
 
+        # Bouw de type-validators één keer op in plaats van opnieuw voor elke cel
+        self._type_validators = {
+            "STRING": lambda v: isinstance(v, str),
+            "NUMBER": lambda v: isinstance(v, (int)) and not isinstance(v, bool),  # Specifically check for int
+            "BOOLEAN": lambda v: str(v).lower() in ["ja", "nee", None],
+            "DATE": lambda v: self._is_valid_date(v)
+        }
+        # Toegestane waarden per kolom als set, zodat de controle per cel O(1) is
+        self._allowed_values_sets: Dict[str, set] = {}
+
     def validate_excel(self, df: pd.DataFrame) -> List[Dict]:
         """
         Valideer een Excel bestand tegen de metadata specificaties.
@@ -18,22 +39,23 @@ class ExcelValidator:
         Returns:
             List[Dict]: Lijst met gevonden fouten
         """
-        print("\nDebug - Initial DataFrame Info:")
-        print("DataFrame shape:", df.shape)
-        print("\nOriginal DataFrame dtypes:")
-        print(df.dtypes)
-        
+        # Debug-uitvoer alleen opbouwen als het debugniveau aan staat; dtypes en rijen
+        # omzetten naar tekst is bij grote bestanden niet gratis
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("DataFrame shape: %s", df.shape)
+            logger.debug("Original DataFrame dtypes:\n%s", df.dtypes)
+
         # Convert types before validation
         df = self._convert_dataframe_types(df)
-        
-        print("\nConverted DataFrame dtypes:")
-        print(df.dtypes)
-        print("\nFirst row data:")
-        print(df.iloc[0])
-        print("\nMetadata being used:")
-        print("Object Type:", self.object_type)
-        print("Columns Mapping:", self.columns_mapping)
-        print("Metadata fields:", list(self.metadata.keys()))
+
+        if debug:
+            logger.debug("Converted DataFrame dtypes:\n%s", df.dtypes)
+            if not df.empty:
+                logger.debug("First row data:\n%s", df.iloc[0])
+            logger.debug("Object Type: %s", self.object_type)
+            logger.debug("Columns Mapping: %s", self.columns_mapping)
+            logger.debug("Metadata fields: %s", list(self.metadata.keys()))
 
         errors = []
         self._print_validation_header()
@@ -54,7 +76,7 @@ class ExcelValidator:
         return errors
 
     def _print_validation_header(self):
-        print("\n### Validatie Resultaten ###")
+        logger.debug("### Validatie Resultaten ###")
 
     def _get_column_sets(self, df: pd.DataFrame) -> Tuple[set, set]:
         excel_columns = set(df.columns)
@@ -142,21 +164,9 @@ class ExcelValidator:
 
         type_value = metadata["type"].upper()
 
-        type_validators = {
-            "STRING": lambda v: isinstance(v, str),
-            "NUMBER": lambda v: isinstance(v, (int)) and not isinstance(v, bool),  # Specifically check for int
-            "BOOLEAN": lambda v: str(v).lower() in ["ja", "nee", None],
-            "DATE": lambda v: self._is_valid_date(v)
-        }
-
+        type_validators = self._type_validators
         if type_value in type_validators and not type_validators[type_value](value):
-            error_messages = {
-                "STRING": ("Waarde moet een tekst zijn", "string"),
-                "NUMBER": ("Waarde moet een geheel getal zijn", "geheel getal"),
-                "BOOLEAN": ("Waarde moet Ja, Nee of leeg zijn", "Ja, Nee of leeg"),
-                "DATE": ("Waarde moet een geldige datum zijn", "datum (bijv. 01-01-2023)")
-            }
-            msg, expected = error_messages[type_value]
+            msg, expected = TYPE_ERROR_MESSAGES[type_value]
             errors.append(self._create_error(row, column, msg, str(value), expected))
 
         return errors
@@ -179,42 +189,45 @@ class ExcelValidator:
 
     def _print_validation_results(self, errors: List[Dict]):
         if errors:
-            print(f"\nAantal gevonden fouten: {len(errors)}")
-            for error in errors:
-                print(f"Rij {error['row']}, Kolom '{error['column']}': {error['error']}")
-                print(f"  Gevonden: {error['found']}")
-                print(f"  Verwacht: {error['expected']}")
+            logger.info("Aantal gevonden fouten: %s", len(errors))
+            # De details per fout alleen loggen op debugniveau
+            if logger.isEnabledFor(logging.DEBUG):
+                for error in errors:
+                    logger.debug(
+                        "Rij %s, Kolom '%s': %s (gevonden: %s, verwacht: %s)",
+                        error['row'], error['column'], error['error'], error['found'], error['expected']
+                    )
         else:
-            print("\nGeen validatiefouten gevonden!")
+            logger.info("Geen validatiefouten gevonden!")
 
     def _print_column_analysis(self, excel_columns: set, config_columns: set):
         """
-        Print een analyse van de kolommen in het Excel bestand.
+        Log een analyse van de kolommen in het Excel bestand (debugniveau).
 
         Args:
             excel_columns (set): Set van kolommen in het Excel bestand
             config_columns (set): Set van kolommen in de configuratie
         """
-        print("\nKolommenanalyse:")
-        print(f"Aantal kolommen in Excel: {len(excel_columns)}")
-        print(f"Aantal kolommen in configuratie: {len(config_columns)}")
+        logger.debug("Kolommenanalyse:")
+        logger.debug("Aantal kolommen in Excel: %s", len(excel_columns))
+        logger.debug("Aantal kolommen in configuratie: %s", len(config_columns))
 
         missing_columns = config_columns - excel_columns
         extra_columns = excel_columns - config_columns
 
         if missing_columns:
-            print("\nOntbrekende kolommen:")
+            logger.debug("Ontbrekende kolommen:")
             for col in missing_columns:
-                print(f"- {col}")
+                logger.debug("- %s", col)
 
         if extra_columns:
-            print("\nExtra kolommen in Excel (niet in configuratie):")
+            logger.debug("Extra kolommen in Excel (niet in configuratie):")
             for col in extra_columns:
-                print(f"- {col}")
+                logger.debug("- %s", col)
 
-        print("\nAanwezige kolommen:")
+        logger.debug("Aanwezige kolommen:")
         for col in sorted(excel_columns & config_columns):
-            print(f"- {col}")
+            logger.debug("- %s", col)
 
     def _validate_required_columns(self, df: pd.DataFrame, excel_columns: set) -> List[Dict]:
         """
@@ -268,10 +281,9 @@ class ExcelValidator:
         missing_columns = config_columns - excel_columns
 
         for col in missing_columns:
-            # Controleer of de kolom verplicht is volgens de metadata
-            if any(self.metadata.get(api_name, {}).get("required", False)
-                  for api_name, excel_name in self.reverse_mapping.items()
-                  if excel_name == col):
+            # Controleer of de kolom verplicht is volgens de metadata (columns_mapping gaat van Excel naar API)
+            api_name = self.columns_mapping.get(col)
+            if api_name is not None and self.metadata.get(api_name, {}).get("required", False):
                 errors.append(self._create_error(
                     "N/A",
                     col,
@@ -359,7 +371,10 @@ class ExcelValidator:
             return errors
 
         allowed_values = metadata["attributeValueOptions"]
-        if str(value) not in allowed_values:
+        allowed_set = self._allowed_values_sets.get(column)
+        if allowed_set is None:
+            allowed_set = self._allowed_values_sets[column] = set(allowed_values)
+        if str(value) not in allowed_set:
             errors.append(self._create_error(
                 row,
                 column,
@@ -429,8 +444,8 @@ class ExcelValidator:
         Returns:
             pd.DataFrame: DataFrame with converted types
         """
-        print("\nDebug - Converting DataFrame types based on metadata")
-        
+        logger.debug("Converting DataFrame types based on metadata")
+
         for api_name, excel_name in self.reverse_mapping.items():
             if excel_name not in df.columns:
                 continue
@@ -438,16 +453,20 @@ class ExcelValidator:
             field_metadata = self.metadata.get(api_name, {})
             field_type = field_metadata.get('type', '').upper()
             
-            print(f"\nProcessing column: {excel_name}")
-            print(f"Metadata type: {field_type}")
-            print(f"Current dtype: {df[excel_name].dtype}")
-            
+            logger.debug(
+                "Processing column: %s (metadata type: %s, current dtype: %s)",
+                excel_name, field_type, df[excel_name].dtype
+            )
+
             try:
                 if field_type == 'NUMBER':
                     # Check if it should be integer (you might want to add a specific integer flag in metadata)
                     df[excel_name] = pd.to_numeric(df[excel_name], errors='coerce').astype('Int64')
                 elif field_type == 'STRING':
-                    df[excel_name] = df[excel_name].astype(str).replace('nan', None)
+                    # Lege cellen (NaN of pd.NA bij string[pyarrow]) blijven None, zodat ze niet
+                    # als 'nan'/'<NA>' naar de API gaan en de verplicht-check ze nog ziet
+                    waarden = df[excel_name]
+                    df[excel_name] = waarden.astype(str).astype(object).where(waarden.notna(), None)
                 elif field_type == 'DATE':
                     df[excel_name] = pd.to_datetime(df[excel_name], errors='coerce')
                 elif field_type == 'BOOLEAN':
@@ -455,11 +474,11 @@ class ExcelValidator:
                     # df[excel_name] = df[excel_name].map({'Ja': True, 'Nee': False})
                     pass
                 
-                print(f"New dtype: {df[excel_name].dtype}")
-                
+                logger.debug("New dtype for %s: %s", excel_name, df[excel_name].dtype)
+
             except Exception as e:
-                print(f"Error converting {excel_name}: {str(e)}")
-            
+                logger.warning("Error converting %s: %s", excel_name, e)
+
         return df
 
     def show_metadata_columns(self):
@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
 
 # Importeer de benodigde helpers en API-client
@@ -12,8 +13,45 @@ from handlers.excel_uploader import ExcelUploader
 from handlers.dataset_downloader import DatasetDownloader
 
 
-# Stel logging in op DEBUG-niveau voor gedetailleerde informatie
-logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# De projectmap ligt één niveau boven views/; één keer bepalen bij het importeren
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+@st.cache_resource(show_spinner=False)
+def get_api_client(client_id: str, client_secret: str, base_url: str, token_url: str) -> APIClient:
+    """
+    Maak de APIClient één keer per proces (en per set credentials) aan. Zo blijft ook het
+    access token bewaard en hoeft het niet bij elke Streamlit rerun opnieuw opgehaald te worden.
+    """
+    return APIClient(
+        client_id=client_id,
+        client_secret=client_secret,
+        base_url=base_url,
+        token_url=token_url
+    )
+
+
+@st.cache_resource(show_spinner=False, hash_funcs={APIClient: lambda client: client.base_url})
+def get_dataset_manager(project_root: str, api_client: APIClient) -> DatasetConfig:
+    """
+    Maak de DatasetConfig één keer per proces (en per omgeving) aan, zodat de configuratiemap
+    niet bij elke Streamlit rerun opnieuw gescand en ingelezen wordt.
+    """
+    return DatasetConfig(project_root, api_client)
+
+
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={APIClient: lambda client: client.base_url})
+def get_complexen(api_client: APIClient) -> list:
+    """
+    Haal de lijst van complexen op uit de API en cache deze een uur per omgeving.
+
+    De cache is gekoppeld aan de base URL van de client, zodat Accept en Production elk
+    hun eigen lijst houden en wisselen van omgeving geen cache van andere sessies wist.
+    """
+    return api_client.get_complexen()
+
 
 class VIPDataMakelaarApp:
     """
@@ -28,8 +66,7 @@ class VIPDataMakelaarApp:
     def __init__(self):
         self.api_client = None
         self.dataset_manager = None
-        huidige_map = Path(__file__).resolve().parent
-        self.project_root = huidige_map.parent
+        self.project_root = PROJECT_ROOT
 
     def _initialize_app(self, environment: str):
         """Initialiseer de API-client en dataset-manager op basis van de geselecteerde omgeving."""
@@ -44,21 +81,16 @@ class VIPDataMakelaarApp:
         if self.api_client and self.api_client.base_url == base_url:
             return
 
-        # Wis de cache bij het wisselen van omgeving voor verse data.
-        st.cache_data.clear()
-
         client_id = os.getenv(f"{env_prefix}_CLIENT_ID")
         client_secret = os.getenv(f"{env_prefix}_CLIENT_SECRET")
         token_url = os.getenv(f"{env_prefix}_TOKEN_URL")
 
-        # DEBUG: Print de gebruikte credentials om te verifiëren
-        print(f"--- [DEBUG] Geselecteerde omgeving: {environment} ---")
-        print(f"--- [DEBUG] Gebruikte Client ID: {client_id} ---")
-        # Let op: print de secret alleen voor debuggen, verwijder dit later!
-        print(f"--- [DEBUG] Gebruikte Client Secret: {'*' * len(client_secret) if client_secret else 'Niet gevonden'} ---")
-        print(f"--- [DEBUG] Gebruikte Base URL: {base_url} ---")
-        print(f"--- [DEBUG] Gebruikte Token URL: {token_url} ---")
-
+        # Log de gebruikte instellingen om te verifiëren (de secret zelf wordt nooit gelogd)
+        logger.debug("Geselecteerde omgeving: %s", environment)
+        logger.debug("Gebruikte Client ID: %s", client_id)
+        logger.debug("Client Secret gevonden: %s", bool(client_secret))
+        logger.debug("Gebruikte Base URL: %s", base_url)
+        logger.debug("Gebruikte Token URL: %s", token_url)
 
         if not all([client_id, client_secret, base_url, token_url]):
             st.error(f"Omgevingsvariabelen voor '{environment}' zijn niet correct ingesteld.")
@@ -66,13 +98,8 @@ class VIPDataMakelaarApp:
             self.dataset_manager = None
             st.stop()
 
-        self.api_client = APIClient(
-            client_id=client_id,
-            client_secret=client_secret,
-            base_url=base_url,
-            token_url=token_url
-        )
-        self.dataset_manager = DatasetConfig(self.project_root, self.api_client)
+        self.api_client = get_api_client(client_id, client_secret, base_url, token_url)
+        self.dataset_manager = get_dataset_manager(str(self.project_root), self.api_client)
 
     def start(self) -> None:
         """
@@ -115,12 +142,11 @@ class VIPDataMakelaarApp:
             if geselecteerde_dataset and geselecteerde_dataset != "Selecteer dataset":
                 dataset_configuratie = self.dataset_manager.get_dataset_config(geselecteerde_dataset)
                 self._toon_dataset_velden(dataset_configuratie)
-                print("toon dataset velden")
 
                 # check if complexFilter is true
                 complex_filter = dataset_configuratie.get("complexFilter", False)
                 if complex_filter:
-                    complexen = self.get_complexen()
+                    complexen = get_complexen(self.api_client)
 
                     complex_selectie = self.toon_complexen(complexen=complexen)
                 else:
@@ -160,8 +186,8 @@ class VIPDataMakelaarApp:
         Toon de Excel-kolomnamen (velden) van de geselecteerde dataset.
         """
         excel_columns = [attribuut["excelColumnName"] for attribuut in config.get("attributes", [])]
-        df = pd.DataFrame(excel_columns, columns=["Velden :"])
-        st.dataframe(df, hide_index=True)
+        # Geef een Arrow-tabel mee; een DataFrame zet Streamlit eerst zelf nog om naar Arrow
+        st.dataframe(pa.table({"Velden :": excel_columns}), hide_index=True)
 
     def _stap_download_excel(self, selected_dataset: str, config: dict, complex_selectie: list = None) -> None:
         """
@@ -196,7 +222,6 @@ class VIPDataMakelaarApp:
         Toon de complexen die beschikbaar zijn.
         """
         st.write("Selecteer complex:")
-        print("Selecteer complex:")
         if complexen:
             df = pd.DataFrame(complexen, columns=["Complexen"])
             df["Selecteer"] = False
@@ -207,11 +232,8 @@ class VIPDataMakelaarApp:
                     help="Selecteer de complexen voor deze dataset",
                 )
             }, disabled=["Complexen"])
-            print(complex_keuze)
-            complex_keuze_lijst = []
-            for index, row in complex_keuze.iterrows():
-                if row["Selecteer"]:
-                    complex_keuze_lijst.append(row["Complexen"])
+            complex_keuze_lijst = complex_keuze.loc[complex_keuze["Selecteer"], "Complexen"].tolist()
+            logger.debug("Geselecteerde complexen: %s", complex_keuze_lijst)
 
 
             st.write(f"Je hebt {len(complex_keuze_lijst)} complexen geselecteerd.")
@@ -224,12 +246,4 @@ class VIPDataMakelaarApp:
             return complex_keuze_lijst
         return None
 
-    @st.cache_data(ttl=3600)  # Cache for 1 hour
-    def get_complexen(_self):
-        """
-        Haal de lijst van complexen op uit de API.
-        """
-        complexen = _self.api_client.get_complexen()
-        return complexen
-
 
@@ -1,10 +1,32 @@
+import hashlib
+import hmac
 import logging
 import os
+from typing import Optional
+
 import streamlit as st
 from dotenv import load_dotenv
 
-# Stel logging in op DEBUG-niveau voor extra informatie (voor ontwikkelaars)
-logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Laad de omgevingsvariabelen uit een .env-bestand (indien aanwezig) één keer bij het importeren,
+# in plaats van bij elke rerun van het inlogscherm
+load_dotenv()
+
+
+def _komt_overeen(invoer: str, verwacht: Optional[str]) -> bool:
+    """
+    Vergelijk een ingevoerde waarde met de verwachte waarde in constante tijd.
+
+    Beide waarden worden eerst gehasht (SHA-256), zodat ook het verschil in lengte niet via
+    de vergelijkingstijd uitlekt. Als de verwachte waarde niet is ingesteld, faalt de vergelijking.
+    """
+    if verwacht is None:
+        return False
+    return hmac.compare_digest(
+        hashlib.sha256(invoer.encode("utf-8")).digest(),
+        hashlib.sha256(verwacht.encode("utf-8")).digest(),
+    )
 
 
 def toon_loginscherm():
@@ -14,12 +36,9 @@ def toon_loginscherm():
     In dit formulier kunnen gebruikers op Enter drukken om het formulier in te dienen.
     De ingevoerde gegevens worden vergeleken met de waarden die zijn opgeslagen in omgevingsvariabelen.
     """
-    # Laad de omgevingsvariabelen uit een .env-bestand (indien aanwezig)
-    load_dotenv()
-
     # Log de huidige werkdirectory en een voorbeeld van een geladen omgevingsvariabele
-    logging.debug(f"Huidige werkdirectory: {os.getcwd()}")
-    logging.debug(f"Omgevingsvariabele APP_USERNAME: {os.getenv('APP_USERNAME')}")
+    logger.debug("Huidige werkdirectory: %s", os.getcwd())
+    logger.debug("Omgevingsvariabele APP_USERNAME: %s", os.getenv('APP_USERNAME'))
 
     # Toon de titel van de loginpagina
     st.title("Inloggen")
@@ -39,8 +58,11 @@ def toon_loginscherm():
             verwachte_gebruikersnaam = os.getenv("APP_USERNAME")
             verwachte_wachtwoord = os.getenv("APP_PASSWORD")
 
-            # Vergelijk de ingevoerde gebruikersnaam en wachtwoord met de verwachte waarden
-            if gebruikersnaam == verwachte_gebruikersnaam and wachtwoord == verwachte_wachtwoord:
+            # Vergelijk de ingevoerde gebruikersnaam en wachtwoord met de verwachte waarden.
+            # Beide vergelijkingen worden altijd uitgevoerd (geen short-circuit).
+            gebruikersnaam_ok = _komt_overeen(gebruikersnaam, verwachte_gebruikersnaam)
+            wachtwoord_ok = _komt_overeen(wachtwoord, verwachte_wachtwoord)
+            if gebruikersnaam_ok & wachtwoord_ok:
                 # Als de inloggegevens kloppen, zet de sessie-status op 'logged_in' en toon een succesbericht
                 st.session_state["logged_in"] = True
                 st.success("Je bent succesvol ingelogd!")